@@ -0,0 +1,87 @@
+"""
+Память на узел дерева элементов
+
+Строит страницу из rows VerticalLayout по children дочерних элементов
+(Paragraph, Span, Button) и измеряет tracemalloc после сборки мусора:
+сразу после построения дерева и после рендера и сбора стилей. Во втором
+замере HTML и стили остаются в памяти, как у сервера, который отдаёт
+страницу; отдельно выводится пик памяти во время рендера.
+
+Запуск из корня репозитория:
+    python -m benchmarks.memory_per_node
+    python -m benchmarks.memory_per_node --rows 100 --children 9
+
+Для сравнения «до/после» тот же скрипт запускается на другой версии
+пакета, выгруженной рядом (<коммит> — версия для сравнения):
+    git worktree add /tmp/layoutml-before <коммит>
+    python -m benchmarks.memory_per_node --tree /tmp/layoutml-before
+"""
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+
+
+def import_elements() -> tuple:
+    """Классы элементов; импортируются до начала измерения"""
+    from layoutml import Page
+    from layoutml.elements import Button, Paragraph, Span
+    from layoutml.layout import VerticalLayout
+
+    return Page, VerticalLayout, (Paragraph, Span, Button)
+
+
+def build_page(classes: tuple, rows: int, children: int):
+    page_class, layout_class, kinds = classes
+    page = page_class(object_name="report")
+    for row in range(rows):
+        layout = layout_class(object_name=f"row{row}")
+        for index in range(children):
+            kind = kinds[index % len(kinds)]
+            layout.add_element(kind(text=f"{row}.{index}"))
+        page.add_element(layout)
+    return page
+
+
+def measure(rows: int, children: int) -> None:
+    nodes = rows * (children + 1)
+    classes = import_elements()
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    page = build_page(classes, rows, children)
+    build_time = time.perf_counter() - start
+    gc.collect()
+    built = tracemalloc.get_traced_memory()[0]
+
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    html = page.get_html()
+    styles = page.get_styles()
+    render_time = time.perf_counter() - start
+    gc.collect()
+    rendered, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del html, styles
+
+    print(f"узлов: {nodes} ({rows} x {children + 1})")
+    print(f"построено:              {built / nodes:7.0f} байт/узел  {build_time:6.2f} с")
+    print(f"после рендера и стилей: {rendered / nodes:7.0f} байт/узел  {render_time:6.2f} с")
+    print(f"пик во время рендера:   {peak / nodes:7.0f} байт/узел")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Память на узел дерева элементов (tracemalloc)")
+    parser.add_argument("--rows", type=int, default=500, help="число VerticalLayout на странице")
+    parser.add_argument("--children", type=int, default=99, help="дочерних элементов в каждом layout")
+    parser.add_argument("--tree", help="каталог с другой версией пакета layoutml")
+    args = parser.parse_args()
+    if args.tree:
+        sys.path.insert(0, args.tree)
+    measure(args.rows, args.children)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Масштабирование рендера с размером дерева
+
+Холодный рендер (без кэша) страницы из N строк (строка — layout,
+параграф и кнопка) и вложенных layout глубины D (на каждом уровне
+20 параграфов по 200 символов). Дерево строится заново перед каждым
+замером, выводится лучший из repeat результат. Время на строку
+при линейном рендере не растёт с N.
+
+Запуск из корня репозитория:
+    python -m benchmarks.render_scaling
+    python -m benchmarks.render_scaling --rows 1000 5000 --depths 50
+
+Для сравнения «до/после» тот же скрипт запускается на другой версии
+пакета, выгруженной рядом (<коммит> — версия для сравнения):
+    git worktree add /tmp/layoutml-before <коммит>
+    python -m benchmarks.render_scaling --tree /tmp/layoutml-before
+"""
+
+import argparse
+import gc
+import sys
+import time
+
+
+def build_rows(rows: int):
+    from layoutml import Page
+    from layoutml.elements import Button, Paragraph
+    from layoutml.layout import HorizontalLayout
+
+    page = Page(object_name="rows")
+    for row in range(rows):
+        layout = HorizontalLayout(object_name=f"row{row}")
+        layout.add_element(Paragraph(text=f"row {row}", object_name="text"))
+        layout.add_element(Button(text="open", object_name="open"))
+        page.add_element(layout)
+    return page
+
+
+def build_nested(depth: int):
+    from layoutml import Page
+    from layoutml.elements import Paragraph
+    from layoutml.layout import VerticalLayout
+
+    page = Page(object_name="nested")
+    parent = None
+    for level in range(depth):
+        layout = VerticalLayout(object_name=f"level{level}")
+        for index in range(20):
+            layout.add_element(Paragraph(text="x" * 200))
+        if parent is None:
+            page.add_element(layout)
+        else:
+            parent.add_element(layout)
+        parent = layout
+    return page
+
+
+def best_render(build, size: int, repeat: int) -> tuple:
+    """Лучшее время холодного рендера и размер HTML"""
+    best = None
+    for _ in range(repeat):
+        page = build(size)
+        gc.collect()
+        start = time.perf_counter()
+        html = page.get_html()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(html)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Время холодного рендера в зависимости от размера дерева")
+    parser.add_argument("--rows", type=int, nargs="*", default=[1000, 5000, 20000], help="число строк страницы")
+    parser.add_argument("--depths", type=int, nargs="*", default=[50, 100, 200], help="глубина вложенных layout")
+    parser.add_argument("--repeat", type=int, default=3, help="число замеров, выводится лучший")
+    parser.add_argument("--tree", help="каталог с другой версией пакета layoutml")
+    args = parser.parse_args()
+    if args.tree:
+        sys.path.insert(0, args.tree)
+
+    for rows in args.rows:
+        elapsed, size = best_render(build_rows, rows, args.repeat)
+        print(f"строк {rows:6d}: {elapsed * 1e3:8.1f} мс  {elapsed / rows * 1e6:6.1f} мкс/строку  {size // 1024} КБ")
+    for depth in args.depths:
+        elapsed, size = best_render(build_nested, depth, args.repeat)
+        print(f"глубина {depth:4d}: {elapsed * 1e3:8.1f} мс  {elapsed / depth * 1e3:6.2f} мс/уровень  {size // 1024} КБ")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 from typing import List, Dict, Optional, Any
 from layoutml.base import BaseElement
 from .base import BaseElement
+from .base.Observable import iter_items
 
 
 class Body(BaseElement):
@@ -9,6 +10,8 @@ class Body(BaseElement):
     Содержит основное содержимое страницы
     """
 
+    __slots__ = ("content", "elements", "links", "scripts_footer")
+
     object_type: str
 
     def __init__(self, content: str = "", object_name=None, **kwargs):
@@ -56,7 +59,7 @@ class Body(BaseElement):
         """Рендеринг скриптов в конце body"""
         scripts = []
         for script in self.scripts_footer:
-            content = script.pop("_content", None)
+            content = script.get("_content")
             attrs = " ".join(f'{k}="{v}"' for k, v in script.items() if not k.startswith("_"))
 
             if content:
@@ -67,29 +70,28 @@ class Body(BaseElement):
         return "\n    ".join(scripts)
 
     def get_html(self):
-        parts = []
-        parts.append(self.content)
+        return self._render_str()
+
+    def _iter_fragments(self, tab: int = 0):
+        yield self._get_open_tag()
+        yield self.content
 
         if self.elements:
-            html_context = ""
-            for element in self.elements:
-                if hasattr(element, "get_html"):
-                    html_context += "\n\t" + element.get_html()
-                else:
-                    html_context += "\n\t" + str(element)
-            parts.append(html_context)
+            yield "\n"
+            for element in iter_items(self.elements):
+                yield "\n\t"
+                yield element if hasattr(element, "render_into") else str(element)
 
         if self.scripts_footer:
-            parts.append(self._get_scripts_footer_str())
+            yield "\n"
+            yield self._get_scripts_footer_str()
 
-        return super().get_html(content="\n".join(parts))
+        if self.content or self.elements or self.scripts_footer:
+            yield "\n"
+        yield f"</{self.tag}>"
 
-    def get_styles(self) -> dict:
-        css_styles: dict = {}
-        css_styles.update(super().get_styles())
-        for element in self.elements:
-            css_styles.update(element.get_styles())
-        return css_styles
+    def _get_children(self):
+        return self.elements
 
     def __str__(self) -> str:
         return self.get_html()
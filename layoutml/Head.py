@@ -1,5 +1,6 @@
 from typing import List, Dict, Optional, Any
 from .base import BaseElement
+from .base.css import is_minify_enabled, minify_css_rules
 
 
 class Head(BaseElement):
@@ -7,6 +8,8 @@ class Head(BaseElement):
     Класс для HTML head элемента
     """
 
+    __slots__ = ("title", "meta_tags", "links", "scripts", "styles_css", "base_url")
+
     object_type: str
 
     def __init__(self, title: str = "", object_name=None, **kwargs):
@@ -113,7 +116,55 @@ class Head(BaseElement):
 
     def add_preload(self, href: str, as_type: str, **attributes) -> "Head":
         """Добавить предзагрузку ресурса"""
-        self.add_link(rel="preload", href=href, as_=as_type, **attributes)
+        self.add_link(rel="preload", href=href, **{"as": as_type}, **attributes)
+        return self
+
+    def add_deferred_stylesheet(self, href: str) -> "Head":
+        """
+        Подключить CSS файл без блокировки отрисовки
+
+        Файл загружается как preload и становится таблицей стилей по onload,
+        без JavaScript подключается обычной ссылкой из <noscript>.
+        """
+        self.add_preload(href, "style", onload="this.onload=null;this.rel='stylesheet'", _noscript=True)
+        return self
+
+    def add_style(self, css_text: str) -> "Head":
+        """Добавить встроенный блок <style>"""
+        self.styles_css.append(css_text)
+        return self
+
+    def replace_style(self, old_css_text: Optional[str], css_text: Optional[str]) -> "Head":
+        """
+        Заменить встроенный блок <style> с текстом old_css_text
+
+        Если такого блока нет, новый добавляется, пустой css_text удаляет блок.
+        """
+        index = self.styles_css.index(old_css_text) if old_css_text in self.styles_css else None
+        if index is None:
+            if css_text:
+                self.styles_css.append(css_text)
+        elif css_text:
+            self.styles_css[index] = css_text
+        else:
+            del self.styles_css[index]
+        return self
+
+    def replace_stylesheet(self, old_href: str, href: Optional[str]) -> "Head":
+        """
+        Заменить ссылку на CSS файл, сохранив её атрибуты
+
+        Учитываются обычные и отложенные (add_deferred_stylesheet) ссылки,
+        href=None удаляет ссылку.
+        """
+        for index in reversed(range(len(self.links))):
+            link = self.links[index]
+            if link.get("href") != old_href or link.get("rel") not in ("stylesheet", "preload"):
+                continue
+            if href is None:
+                del self.links[index]
+            else:
+                self.links[index] = {**link, "href": href}
         return self
 
     def _get_meta_str(self) -> str:
@@ -138,13 +189,15 @@ class Head(BaseElement):
                 attrs_dict = {k: v for k, v in link.items() if not k.startswith("_")}
                 attrs = " ".join(f'{k}="{v}"' for k, v in attrs_dict.items())
                 links.append(f"<link {attrs}>")
+                if link.get("_noscript"):
+                    links.append(f'<noscript><link rel="stylesheet" href="{link["href"]}"></noscript>')
         return "\n    ".join(links)
 
     def _get_scripts_str(self) -> str:
         """Рендеринг script тегов"""
         scripts = []
         for script in self.scripts:
-            content = script.pop("_content", None)
+            content = script.get("_content")
             attrs = " ".join(f'{k}="{v}"' for k, v in script.items() if not k.startswith("_"))
 
             if content:
@@ -155,6 +208,8 @@ class Head(BaseElement):
 
     def get_css_text(self) -> str:
         css_styles: dict = self.selectors_styles.get_styles()
+        if is_minify_enabled():
+            return f"<style>{minify_css_rules(css_styles)}</style>"
         css_text: str = ""
         for selector_name, css in css_styles.items():
             css_text += f"{selector_name} " + "{" + css + "}\n"
@@ -175,10 +230,14 @@ class Head(BaseElement):
         if self.links:
             parts.append(self._get_links_str())
 
+        style_open = "<style>" if is_minify_enabled() else "<style>\n"
+        for css_text in self.styles_css:
+            parts.append(f"{style_open}{css_text}</style>")
+
         scripts = self._get_scripts_str()
         if scripts:
             parts.append(scripts)
-        if self.selectors_styles:
+        if self._selectors_styles:
             parts.append(self.get_css_text())
 
         return super().get_html(content="\n    ".join(parts))
@@ -1,26 +1,60 @@
 import os
+import posixpath
 import copy
+import json
+import hashlib
+import asyncio
 import inspect
+import signal
 import logging
+from http import HTTPStatus
 
-from starlette.responses import Response, HTMLResponse, PlainTextResponse, JSONResponse
+from starlette.responses import Response, HTMLResponse, PlainTextResponse, JSONResponse, FileResponse, StreamingResponse
 from starlette.requests import Request
 from starlette.exceptions import HTTPException
 from functools import wraps
 from typing import Callable
 
+from layoutml.base.css import format_css_rules, group_css_rules
 from layoutml.pages import get_404_page
 from .Page import Page
 from .router import Router
+from .server import HTTPRequestParser, HTTPParseError, WorkerSupervisor, StaticIndex, StaticAsset, select_encoding, atomic_write
+from .export import StaticExport
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Файлы с хэшем содержимого в имени никогда не меняются
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Манифест заранее собранных стилей (см. LayoutML.build)
+CSS_MANIFEST_NAME = "layoutml-manifest.json"
+CSS_MANIFEST_VERSION = 1
+
+
+def get_url_path(path: str) -> str:
+    """URL файла, путь которого указан относительно корня сайта ("./styles/a.css" -> "/styles/a.css")"""
+    return posixpath.normpath("/" + path.lstrip("/"))
+
 
 class LayoutML:
     def __init__(
         self,
         styles_dirname: str = "styles",
+        keep_alive: bool = True,
+        keep_alive_timeout: float = 5.0,
+        max_keep_alive_requests: int = 100,
+        max_header_size: int = 64 * 1024,
+        max_body_size: int = 16 * 1024 * 1024,
+        stream_html: bool = False,
+        stream_chunk_size: int = 16 * 1024,
+        optimize_css: bool = False,
+        atomic_css: bool = False,
+        bundle_css: bool = False,
+        bundle_min_pages: int = 2,
+        critical_elements: int = 0,
+        minify_css: bool = False,
+        css_manifest: str | None = None,
     ):
         self.router: Router = Router()
         self.error_page: Page = get_404_page()
@@ -36,49 +70,396 @@ class LayoutML:
             ".svg": "image/svg+xml",
         }
         self.styles_dirname = styles_dirname
+        # Объединение одинаковых блоков стилей и атомарные классы
+        self.optimize_css = optimize_css
+        self.atomic_css = atomic_css
+        # Общий для сайта файл стилей и файлы страниц с хэшем в имени
+        self.bundle_css = bundle_css
+        self.bundle_min_pages = bundle_min_pages
+        # URL путей, которые можно кэшировать навсегда
+        self._immutable_paths: set = set()
+        # Встраивание стилей первых элементов страницы (если у страницы не задано своё)
+        self.critical_elements = critical_elements
+        # Минифицированный CSS в файлах стилей, критических стилях и страницах этого приложения
+        self.minify_css = minify_css
         self._css_generated = False
-
-    def render_css_files(self):
+        # Манифест из build(): при запуске стили только подключаются, без записи файлов
+        self.css_manifest = css_manifest
+        # Состояние стилей подключённых страниц: id(page) -> запись (см. refresh_page_css)
+        self._css_pages: dict = {}
+        # Правила, вынесенные в общий файл (bundle_css), и каталог с файлами стилей
+        self._css_shared: set = set()
+        self._css_outdir = "."
+        # Генераторы параметров маршрутов для export(): шаблон маршрута -> функция
+        self._export_params: dict = {}
+        self.static_index: StaticIndex | None = None
+
+        # Постоянные соединения встроенного сервера (HTTP/1.1 keep-alive)
+        self.keep_alive = keep_alive
+        self.keep_alive_timeout = keep_alive_timeout
+        self.max_keep_alive_requests = max_keep_alive_requests
+
+        # Ограничения на размер входящего запроса
+        self.max_header_size = max_header_size
+        self.max_body_size = max_body_size
+
+        # Размер блока при потоковой отдаче файлов без sendfile
+        self.file_chunk_size = 64 * 1024
+
+        # Потоковый рендеринг страниц: head уходит клиенту сразу,
+        # body отправляется блоками не меньше stream_chunk_size
+        self.stream_html = stream_html
+        self.stream_chunk_size = stream_chunk_size
+
+        self._closing = False
+        self._connections = 0
+
+    def get_page_css(self, page: Page) -> str:
+        """Текст таблицы стилей страницы с учётом настроек оптимизации"""
+        return self._format_css(page.get_styles(atomic=self.atomic_css))
+
+    def _format_css(self, styles: dict) -> str:
+        if self.optimize_css:
+            styles = group_css_rules(styles)
+        # False оставляет выбор за CSSBase.minify (общая настройка процесса)
+        return format_css_rules(styles, minify=self.minify_css or None)
+
+    def _prepare_page(self, page: Page) -> Page:
+        """
+        Применить к странице настройки рендеринга приложения
+
+        Вызывается для каждой страницы перед отдачей: при minify_css=True
+        стили в <head> и атрибутах style страницы выводятся минифицированными,
+        если у страницы не задан свой minify_css.
+        """
+        if self.minify_css and page.minify_css is None:
+            page.minify_css = True
+        return page
+
+    def _get_critical_count(self, page: Page) -> int:
+        if page.critical_elements is not None:
+            return page.critical_elements
+        return self.critical_elements
+
+    def _get_css_entry(self, page: Page, css_file_names: list) -> dict:
+        """
+        Запись манифеста для страницы: файлы стилей и критические стили
+
+        Если для страницы включены критические стили, они встраиваются
+        в <style>, а файлы загружаются без блокировки отрисовки.
+        """
+        entry = {"stylesheets": css_file_names}
+        count = self._get_critical_count(page)
+        if count:
+            entry["critical"] = self._format_css(page.get_critical_styles(count, atomic=self.atomic_css))
+        return entry
+
+    def _get_stylesheet_href(self, css_file_name: str) -> str:
+        """
+        Ссылка на файл стилей от корня сайта (/styles/...)
+
+        Страница может отдаваться и экспортироваться по вложенному пути
+        (/docs/intro): относительная ссылка разрешилась бы от её каталога.
+        """
+        return get_url_path(css_file_name)
+
+    def _attach_stylesheets(self, page: Page, entry: dict) -> None:
+        """Подключить к странице файлы стилей из записи манифеста"""
+        if "critical" not in entry:
+            for css_file_name in entry["stylesheets"]:
+                page.head.add_stylesheet(self._get_stylesheet_href(css_file_name))
+            return
+        if entry["critical"]:
+            page.head.add_style(entry["critical"])
+        for css_file_name in entry["stylesheets"]:
+            page.head.add_deferred_stylesheet(self._get_stylesheet_href(css_file_name))
+
+    def _get_css_pages(self) -> list:
+        """Страницы, для которых создаются файлы стилей, и уникальные имена файлов"""
         all_pages_name = []
         page_index = 1
 
-        for page in self._pages:
-            if not page.render_css_file:
-                continue
-            page_styles: dict = page.get_styles()
-            if not page_styles:
-                continue
+        pages = [page for page in self._pages if page.render_css_file]
+        if self.error_page and self.error_page.render_css_file:
+            pages.append(self.error_page)
+
+        result = []
+        for page in pages:
             page_name = page.get_object_name()
             if page_name in all_pages_name:
                 page_name += str(page_index)
                 page_index += 1
-            css_text: str = ""
-            for selector_name, css in page_styles.items():
-                css_text += f"{selector_name} " + "{\n" + css + "}\n"
+            all_pages_name.append(page_name)
+            result.append((page, page_name))
+        return result
+
+    def _get_hashed_css_name(self, name: str, css_text: str) -> str:
+        """Путь файла стилей с хэшем содержимого в имени"""
+        digest = hashlib.sha256(css_text.encode("utf-8")).hexdigest()[:10]
+        return f"{self.styles_dirname}/{name}.{digest}.css"
+
+    def get_css_manifest(self) -> tuple:
+        """
+        Рассчитать файлы стилей, не записывая их
+
+        Возвращает пару (files, manifest): files — {путь: текст CSS},
+        manifest — словарь с записями страниц (см. build), пригодный для json.
+        """
+        common_file_name = None
+        if self.bundle_css:
+            files, pages, common_file_name = self._plan_css_bundles()
+        else:
+            files, pages = self._plan_css_files()
+        manifest = {
+            "version": CSS_MANIFEST_VERSION,
+            "styles_dirname": self.styles_dirname,
+            "common": common_file_name,
+            "pages": pages,
+            "immutable": sorted(files) if self.bundle_css else [],
+        }
+        return files, manifest
+
+    def _plan_css_files(self) -> tuple:
+        files, pages = {}, {}
+        for page, page_name in self._get_css_pages():
+            css_text = self.get_page_css(page)
+            if not css_text:
+                continue
             css_file_name = f"{self.styles_dirname}/{page_name}.css"
-            with open(css_file_name, "w") as f:
-                f.write(css_text)
-            page.head.add_stylesheet(css_file_name)
+            files[css_file_name] = css_text
+            pages[page_name] = self._get_css_entry(page, [css_file_name])
+        return files, pages
+
+    def _plan_css_bundles(self) -> tuple:
+        """
+        Разделить стили страниц на общий файл сайта и остатки страниц
+
+        Правило (селектор и блок объявлений), встречающееся не меньше чем на
+        bundle_min_pages страницах, попадает в common.<hash>.css, остальные
+        правила страницы в <page>.<hash>.css. Селектор, у которого на разных
+        страницах разные блоки объявлений, в общий файл не выносится: каждая
+        страница получает свой вариант в своём файле. Общий файл подключается первым,
+        поэтому общие правила оказываются в каскаде раньше правил страницы.
+        Имена зависят от содержимого, такие файлы отдаются с заголовком
+        Cache-Control: immutable.
+        """
+        css_pages = [(page, name, page.get_styles(atomic=self.atomic_css)) for page, name in self._get_css_pages()]
+
+        usage: dict = {}
+        # Блоки объявлений каждого селектора на всех страницах
+        variants: dict = {}
+        for _, _, styles in css_pages:
+            for rule in styles.items():
+                usage[rule] = usage.get(rule, 0) + 1
+                variants.setdefault(rule[0], set()).add(rule[1])
+        min_pages = max(self.bundle_min_pages, 1)
+        shared = {rule for rule, count in usage.items() if count >= min_pages and len(variants[rule[0]]) == 1}
+
+        self._css_shared = shared
+        files, pages = {}, {}
+        common = {}
+        for _, _, styles in css_pages:
+            for rule in styles.items():
+                if rule in shared:
+                    common.setdefault(*rule)
+        common_text = self._format_css(common)
+        common_file_name = None
+        if common_text:
+            common_file_name = self._get_hashed_css_name("common", common_text)
+            files[common_file_name] = common_text
+
+        for page, page_name, styles in css_pages:
+            css_file_names = []
+            if common_file_name and any(rule in shared for rule in styles.items()):
+                css_file_names.append(common_file_name)
+            residue = {selector: css for selector, css in styles.items() if (selector, css) not in shared}
+            css_text = self._format_css(residue)
+            if css_text:
+                css_file_name = self._get_hashed_css_name(page_name, css_text)
+                files[css_file_name] = css_text
+                css_file_names.append(css_file_name)
+            if css_file_names:
+                pages[page_name] = self._get_css_entry(page, css_file_names)
+        return files, pages, common_file_name
+
+    def _write_css_files(self, files: dict, manifest: dict, outdir: str = ".") -> None:
+        """Записать файлы стилей через временный файл и os.replace"""
+        immutable = set(manifest["immutable"])
+        for css_file_name, css_text in files.items():
+            path = os.path.join(outdir, css_file_name)
+            data = css_text.encode("utf-8")
+            if os.path.exists(path):
+                # Файл с хэшем в имени уже содержит те же стили, остальные
+                # не перезаписываются без изменений, чтобы не менять mtime
+                if css_file_name in immutable:
+                    continue
+                with open(path, "rb") as f:
+                    if f.read() == data:
+                        continue
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            atomic_write(path, data)
+
+    def apply_css_manifest(self, manifest: dict) -> None:
+        """
+        Подключить к страницам готовые файлы стилей из манифеста
+
+        Файлы не читаются и не записываются. Стили страниц всё равно
+        собираются в памяти: при этом элементам назначаются классы,
+        на которые ссылаются правила в файлах.
+        """
+        entries = manifest.get("pages", {})
+        for page, page_name in self._get_css_pages():
+            styles = page.get_styles(atomic=self.atomic_css)
+            entry = entries.get(page_name) or {"stylesheets": []}
+            self._attach_stylesheets(page, entry)
+            own = [name for name in entry["stylesheets"] if name != manifest.get("common")]
+            self._css_pages[id(page)] = {
+                "page": page,
+                "name": page_name,
+                "fingerprint": hash(tuple(styles.items())),
+                "stylesheet": own[-1] if own else None,
+                "critical": entry.get("critical"),
+                "deferred": "critical" in entry or bool(self._get_critical_count(page)),
+            }
+        self._immutable_paths.update(get_url_path(path) for path in manifest.get("immutable", ()))
+        self._css_generated = True
+
+    def build(self, outdir: str = ".", manifest_name: str = CSS_MANIFEST_NAME) -> dict:
+        """
+        Сгенерировать CSS заранее, до запуска сервера
+
+        Файлы стилей и манифест записываются в outdir атомарно (временный
+        файл и os.replace), поэтому параллельные воркеры никогда не видят
+        недописанный файл. Страницы этого приложения сразу получают ссылки
+        на стили. Ссылки не содержат outdir: сервер отдаёт их из outdir
+        (см. _get_static_path). Возвращает манифест.
+        """
+        files, manifest = self.get_css_manifest()
+        self._write_css_files(files, manifest, outdir)
+        self._css_outdir = outdir
+        os.makedirs(outdir, exist_ok=True)
+        atomic_write(
+            os.path.join(outdir, manifest_name),
+            json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8"),
+        )
+        self.apply_css_manifest(manifest)
+        return manifest
+
+    def export(
+        self,
+        outdir: str,
+        workers: int = 1,
+        params: dict | None = None,
+        manifest_name: str = "export-manifest.json",
+        incremental: bool = True,
+    ) -> dict:
+        """
+        Экспортировать приложение в статический сайт
+
+        Экспортируются маршруты, у обработчиков которых нет обязательных
+        параметров, и маршруты из params: {шаблон маршрута: итерируемое или
+        функция, возвращающая словари значений параметров}. Значения
+        параметров пути подставляются в URL, остальные передаются как query.
+        Страницы рендерятся в workers процессах, HTML и CSS записываются
+        атомарно, в outdir сохраняется манифест. Возвращает манифест.
+        Генераторы, объявленные через export_params, используются, если
+        маршрута нет в params. При incremental=True неизменившийся HTML
+        не перезаписывается, страницы с _version и прежними входными данными
+        не рендерятся, а устаревшие файлы удаляются (см. StaticExport).
+        """
+        params = {**self._export_params, **(params or {})}
+        export = StaticExport(
+            self, outdir, workers=workers, params=params, manifest_name=manifest_name, incremental=incremental
+        )
+        return export.run()
+
+    def export_params(self, path: str):
+        """
+        Объявить генератор параметров маршрута для export()
+
+        Декорируемая функция без аргументов возвращает словари значений
+        параметров, например [{"slug": "intro"}, {"slug": "install"}].
+        """
 
-        if self.error_page and self.error_page.render_css_file:
-            page_styles: dict = self.error_page.get_styles()
-            if page_styles:
-                page_name = self.error_page.get_object_name()
-                if page_name in all_pages_name:
-                    page_name += str(page_index)
-                    page_index += 1
-                css_text: str = ""
-                for selector_name, css in page_styles.items():
-                    css_text += f"{selector_name} " + "{\n" + css + "}\n"
-                css_file_name = f"{self.styles_dirname}/{page_name}.css"
-                with open(css_file_name, "w") as f:
-                    f.write(css_text)
-                self.error_page.head.add_stylesheet(css_file_name)
+        def decorator(func: Callable):
+            self._export_params[path] = func
+            return func
+
+        return decorator
+
+    def use_css_manifest(self, path: str = CSS_MANIFEST_NAME) -> "LayoutML":
+        """
+        Использовать стили, собранные build(), вместо генерации при запуске
+
+        Манифест читается при первом ensure_css_generated() (в start() или
+        на первом запросе), файловая система при этом не изменяется.
+        """
+        self.css_manifest = path
+        return self
+
+    def refresh_page_css(self, page: Page) -> bool:
+        """
+        Обновить файл стилей страницы, если её стили изменились
+
+        Пока стили страницы не менялись, проверка стоит O(1) (флаг
+        _styles_dirty). Иначе таблица стилей собирается заново (неизменённые
+        поддеревья берутся из кэша) и сравнивается с отпечатком. При изменении
+        записывается только файл этой страницы с новым хэшем в имени, а ссылка
+        в Head заменяется. Старый файл не удаляется: на него могут ссылаться
+        уже отданные страницы. Возвращает True, если файл был обновлён.
+        """
+        state = self._css_pages.get(id(page))
+        if state is None or state["page"] is not page or not page._styles_dirty:
+            return False
+        styles = page.get_styles(atomic=self.atomic_css)
+        fingerprint = hash(tuple(styles.items()))
+        if fingerprint == state["fingerprint"]:
+            return False
+        state["fingerprint"] = fingerprint
+
+        residue = {selector: css for selector, css in styles.items() if (selector, css) not in self._css_shared}
+        css_text = self._format_css(residue)
+        old_name = state["stylesheet"]
+        new_name = self._get_hashed_css_name(state["name"], css_text) if css_text else None
+        if new_name is not None and new_name != old_name:
+            path = os.path.join(self._css_outdir, new_name)
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            atomic_write(path, css_text.encode("utf-8"))
+            self._immutable_paths.add(get_url_path(new_name))
+
+        head = page.head
+        if old_name is None and new_name is not None:
+            if state["deferred"]:
+                head.add_deferred_stylesheet(self._get_stylesheet_href(new_name))
+            else:
+                head.add_stylesheet(self._get_stylesheet_href(new_name))
+        elif old_name is not None and new_name != old_name:
+            head.replace_stylesheet(
+                self._get_stylesheet_href(old_name), self._get_stylesheet_href(new_name) if new_name else None
+            )
+        state["stylesheet"] = new_name
+
+        count = self._get_critical_count(page)
+        if count:
+            critical = self._format_css(page.get_critical_styles(count, atomic=self.atomic_css))
+            head.replace_style(state["critical"], critical)
+            state["critical"] = critical
+        return True
+
+    def render_css_files(self):
+        files, manifest = self.get_css_manifest()
+        self._write_css_files(files, manifest)
+        self.apply_css_manifest(manifest)
 
     def ensure_css_generated(self):
-        if not self._css_generated:
-            self.render_css_files()
-            self._css_generated = True
+        if self._css_generated:
+            return
+        if self.css_manifest:
+            with open(self.css_manifest, encoding="utf-8") as f:
+                self.apply_css_manifest(json.load(f))
+            self._css_outdir = os.path.dirname(self.css_manifest) or "."
+            return
+        self.render_css_files()
 
     def include_page(self, Page: Page):
         self._pages.append(Page)
@@ -88,9 +469,11 @@ class LayoutML:
 
     def route(self, endpoint: str):
         def decorator(func: Callable):
+            is_async = inspect.iscoroutinefunction(func)
+
             @wraps(func)
             async def wrapper(**kwargs):
-                if inspect.iscoroutinefunction(func):
+                if is_async:
                     return await func(**kwargs)
                 else:
                     return func(**kwargs)
@@ -105,6 +488,35 @@ class LayoutML:
     def set_error_page(self, page: Page):
         self.error_page = page
 
+    def use_static_index(
+        self,
+        root: str = ".",
+        max_cache_bytes: int = 32 * 1024 * 1024,
+        max_file_size: int = 256 * 1024,
+        cache_control: str = "public, max-age=3600",
+        watch: bool = False,
+        precompress: bool = False,
+    ) -> StaticIndex:
+        """
+        Включить индекс статических файлов
+
+        Индекс строится при start(), небольшие файлы кэшируются в памяти,
+        ответы получают ETag, Last-Modified и Cache-Control, а условные
+        запросы — 304. watch=True отслеживает изменения файлов (для разработки).
+        precompress=True один раз создаёт .br/.gz варианты текстовых файлов
+        (включая сгенерированный CSS) и отдаёт их по Accept-Encoding.
+        """
+        self.static_index = StaticIndex(
+            mime_types=self._static_dirs,
+            root=root,
+            max_cache_bytes=max_cache_bytes,
+            max_file_size=max_file_size,
+            cache_control=cache_control,
+            watch=watch,
+            precompress=precompress,
+        )
+        return self.static_index
+
     def _is_static_file(self, path: str) -> bool:
         return any(path.endswith(ext) for ext in self._static_dirs)
 
@@ -112,6 +524,7 @@ class LayoutML:
         self,
         request: Request,
         html_content: str = None,
+        route_match=None,
     ):
         if html_content:
             response = HTMLResponse(
@@ -127,26 +540,105 @@ class LayoutML:
                 headers={"content-type": "text/html; charset=utf-8"},
             )
             if request.url.path:
-                answer: Page = await self.router.dispatch(request, response)
+                answer: Page = await self.router.dispatch(request, response, route_match)
                 if isinstance(answer, (Response, HTMLResponse, PlainTextResponse, JSONResponse)):
                     return answer
                 elif isinstance(answer, Page):
-                    html_content = answer.get_html()
-                elif isinstance(page, str):
-                    html_content = page
+                    self._prepare_page(answer)
+                    if self._css_pages:
+                        self.refresh_page_css(answer)
+                    # Страница из кэша отдаётся целиком, иначе рендерится потоком
+                    if self.stream_html and answer._get_cached_html() is None:
+                        return self._stream_page(answer, response)
+                    html_content = answer.get_html_bytes()
+                elif isinstance(answer, (str, bytes)):
+                    html_content = answer
                 else:
                     response.status_code = 404
+                    self._prepare_page(self.error_page)
                     html_content = self.error_page.get_html()
             response.body = response.render(html_content)
             response.headers["content-length"] = str(len(response.body))
 
             return response
 
+    def _stream_page(self, page: Page, response: Response) -> StreamingResponse:
+        """Потоковый ответ со страницей; заголовки берутся из response обработчика"""
+        streaming = StreamingResponse(self._iter_page_chunks(page), status_code=response.status_code)
+        streaming.raw_headers = [(key, value) for key, value in response.raw_headers if key != b"content-length"]
+        return streaming
+
+    async def _iter_page_chunks(self, page: Page):
+        """
+        Блоки HTML страницы в байтах
+
+        Первый блок — doctype и <head>, чтобы браузер сразу начал загружать
+        стили и скрипты. Между блоками управление возвращается в цикл событий.
+        """
+        buffer = []
+        size = 0
+        first = True
+        for fragment in page.iter_html():
+            buffer.append(fragment)
+            size += len(fragment)
+            if first or size >= self.stream_chunk_size:
+                yield "".join(buffer).encode("utf-8")
+                buffer.clear()
+                size = 0
+                first = False
+                await asyncio.sleep(0)
+        if buffer:
+            yield "".join(buffer).encode("utf-8")
+
+    def _serve_indexed_asset(self, request: Request, asset: StaticAsset) -> Response:
+        media_type = asset.media_type
+        cache_key = request.url.path
+        cache_control = self.static_index.cache_control
+        if request.url.path in self._immutable_paths:
+            cache_control = IMMUTABLE_CACHE_CONTROL
+        headers = {"cache-control": cache_control}
+        if asset.variants:
+            headers["vary"] = "Accept-Encoding"
+            encoding = select_encoding(request.headers.get("accept-encoding"), asset.variants)
+            if encoding:
+                asset = asset.variants[encoding]
+                cache_key = f"{cache_key}|{encoding}"
+                headers["content-encoding"] = encoding
+        headers["etag"] = asset.etag
+        headers["last-modified"] = asset.last_modified
+
+        if asset.is_not_modified(request.headers.get("if-none-match"), request.headers.get("if-modified-since")):
+            return Response(status_code=304, headers=headers)
+
+        content = self.static_index.read(cache_key, asset)
+        if content is not None:
+            return Response(content=content, status_code=200, headers=headers, media_type=media_type)
+        return FileResponse(asset.path, status_code=200, headers=headers, media_type=media_type, stat_result=asset.stat_result)
+
+    def _get_static_path(self, url_path: str) -> tuple:
+        """
+        Корневой каталог и путь файла для URL статического файла
+
+        Ссылки на стили не содержат каталог, в который их записал build()
+        или из которого прочитан манифест (_css_outdir): URL каталога стилей
+        ищутся в нём, остальные относительно рабочего каталога.
+        """
+        styles_url = get_url_path(self.styles_dirname) + "/"
+        if url_path.startswith(styles_url):
+            root = os.path.abspath(os.path.join(self._css_outdir, self.styles_dirname))
+            return root, os.path.join(root, url_path[len(styles_url):])
+        return os.getcwd(), "." + url_path
+
     async def _serve_static_file(self, request: Request):
-        file_path = "." + request.url.path
+        if self.static_index is not None:
+            asset = self.static_index.get(request.url.path)
+            if asset is not None:
+                return self._serve_indexed_asset(request, asset)
+
+        root, file_path = self._get_static_path(request.url.path)
 
         # Безопасность: предотвращаем выход из корневой директории
-        if ".." in file_path or not os.path.abspath(file_path).startswith(os.getcwd()):
+        if ".." in request.url.path or not os.path.abspath(file_path).startswith(root):
             return Response(content=b"", status_code=403, headers={"content-type": "text/plain"})
 
         # Определяем content-type
@@ -163,40 +655,25 @@ class LayoutML:
             return Response(content=b"", status_code=403, headers={"content-type": "text/plain"})
 
         try:
-            with open(file_path, "rb") as f:
-                content = f.read()
-            return Response(content=content, status_code=200, headers={"content-type": content_type})
+            # Файл не читается в память: тело отдаётся потоком при отправке ответа
+            headers = None
+            if request.url.path in self._immutable_paths:
+                headers = {"cache-control": IMMUTABLE_CACHE_CONTROL}
+            return FileResponse(
+                file_path, status_code=200, headers=headers, media_type=content_type, stat_result=os.stat(file_path)
+            )
         except Exception:
             return Response(content=b"", status_code=500, headers={"content-type": "text/plain"})
 
     async def _serve_404(self, request: Request):
         return Response(content="404 Not Found", status_code=404, headers={"content-type": "text/plain; charset=utf-8"})
 
-    def _parse_http(self, request_str):
-        lines = request_str.split("\r\n")
-        method, path, version = lines[0].split(" ")
-
-        headers = {}
-        body = ""
-        is_headers = True
-
-        for line in lines[1:]:
-            if is_headers and line == "":
-                is_headers = False
-                continue
-            if is_headers:
-                key, value = line.split(": ", 1)
-                headers[key] = value
-            else:
-                body += line
-
-        return method, path, version, headers, body
-
     async def __call__(self, request: Request) -> None:
         self.ensure_css_generated()
-        if request.url.path in self.router.routes:
+        route_match = self.router.match(request.url.path)
+        if route_match is not None:
             try:
-                response = await self._serve_html(request)
+                response = await self._serve_html(request, route_match=route_match)
                 return response
             except HTTPException as e:
                 return Response(
@@ -214,71 +691,225 @@ class LayoutML:
             return await self._serve_static_file(request)
         else:
             if self.error_page:
+                self._prepare_page(self.error_page)
                 response = await self._serve_html(request, html_content=self.error_page.get_html())
                 response.status_code = 404
                 return response
             else:
                 return await self._serve_404(request)
 
-    async def _handle_client_compat(self, reader, writer):
-        request_bytes = await reader.read(4096)
-        request_str = request_bytes.decode("utf-8", errors="ignore")
-
-        method, path, version, headers_dict, body = self._parse_http(request_str)
-        query_string = b""
-        if "?" in path:
-            path_part, query_string_part = path.split("?", 1)
-            query_string = query_string_part.encode()
-            path = path_part
-        else:
-            path_part = path
-
-        scope = {
-            "type": "http",
-            "method": method,
-            "path": path_part,
-            "headers": [(k.lower().encode(), v.encode()) for k, v in headers_dict.items()],
-            "query_string": query_string,
-            "client": writer.get_extra_info("peername"),
-            "server": writer.get_extra_info("sockname"),
-            "scheme": "http",
-            "http_version": version,
-        }
+    def _should_keep_alive(self, parser: HTTPRequestParser, served: int) -> bool:
+        """Определяет, можно ли оставить соединение открытым после ответа"""
+        if self._closing or not self.keep_alive or served >= self.max_keep_alive_requests:
+            return False
+        connection = (parser.get_header(b"connection") or b"").lower()
+        if b"close" in connection:
+            return False
+        if parser.http_version == "1.0":
+            return b"keep-alive" in connection
+        return True
 
-        async def receive():
-            return {"type": "http.request", "body": body.encode() if body else b"", "more_body": False}
+    async def _handle_client_compat(self, reader, writer):
+        served = 0
+        self._connections += 1
+        try:
+            while True:
+                parser = HTTPRequestParser(reader, max_header_size=self.max_header_size, max_body_size=self.max_body_size)
+                # Ожидание следующего запроса ограничено тайм-аутом простоя.
+                # Конвейерные (pipelined) запросы уже лежат в буфере reader
+                # и читаются по одному, ответы пишутся в том же порядке.
+                try:
+                    await asyncio.wait_for(parser.read_head(), timeout=self.keep_alive_timeout)
+                except HTTPParseError as e:
+                    self._write_response(writer, PlainTextResponse(e.detail, status_code=e.status_code), keep_alive=False)
+                    await writer.drain()
+                    break
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+
+                served += 1
+                keep_alive = await self._handle_request(parser, writer, served)
+                if not keep_alive:
+                    break
+                # Тело, не прочитанное обработчиком, нужно пропустить
+                # до начала следующего запроса
+                await parser.drain()
+        except (HTTPParseError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._connections -= 1
+            writer.close()
 
-        request = Request(scope=scope)
+    async def _handle_request(self, parser: HTTPRequestParser, writer, served: int) -> bool:
+        scope = parser.get_scope(client=writer.get_extra_info("peername"), server=writer.get_extra_info("sockname"))
+        request = Request(scope=scope, receive=parser.receive)
         response: Response = await self(request)
 
         if not isinstance(response, Response):
             response = Response(content=response)
         if not self._is_static_file(request.url.path):
-            logger.info(f"{method} {path_part} → {response.status_code}")
-        if response is not None:
-            status_line = f"HTTP/1.1 {response.status_code} OK\r\n".encode()
-            headers = b""
-            for key, value in response.headers.items():
-                headers += f"{key}: {value}\r\n".encode()
-            writer.write(status_line + headers + b"\r\n")
-            body = response.body if hasattr(response, "body") else b""
-            if body:
-                writer.write(body if isinstance(body, bytes) else body.encode())
-            await writer.drain()
-
-            # except Exception as e:
-            #     logger.error(f"{method} {path_part} → ERROR: {e} ")
-            # finally:
-            writer.close()
-
-    def start(self, host: str = "localhost", port=3700):
-        self.ensure_css_generated()
-        import asyncio
+            logger.info(f"{parser.method} {parser.path} → {response.status_code}")
+
+        keep_alive = self._should_keep_alive(parser, served)
+        if isinstance(response, FileResponse):
+            self._write_head(writer, response, keep_alive)
+            # Без stat_result в заголовках нет Content-Length: конец тела
+            # обозначается закрытием соединения
+            size = response.stat_result.st_size if response.stat_result is not None else None
+            if not await self._send_file(writer, response.path, size) or size is None:
+                return False
+        elif isinstance(response, StreamingResponse):
+            # HTTP/1.0 не знает chunked: конец тела обозначается закрытием соединения
+            chunked = parser.http_version != "1.0"
+            keep_alive = keep_alive and chunked
+            if not await self._send_streaming(writer, response, keep_alive, chunked):
+                return False
+        else:
+            self._write_response(writer, response, keep_alive)
+        await writer.drain()
+        return keep_alive
+
+    async def _send_file(self, writer, path: str, size: int | None = None) -> bool:
+        """
+        Отправить файл без копирования в память процесса: os.sendfile через
+        loop.sendfile, если транспорт это умеет, иначе чтение блоками
+        фиксированного размера
+
+        Отправляется ровно size байт, указанных в Content-Length (None — до
+        конца файла). Заголовки к этому моменту уже ушли, поэтому при ошибке
+        чтения или отправки, а также если файл стал короче, возвращается
+        False: тело ответа неполное и соединение нужно закрыть.
+        """
+        try:
+            with open(path, "rb") as f:
+                try:
+                    sent = await asyncio.get_running_loop().sendfile(writer.transport, f, count=size)
+                    return size is None or sent == size
+                except NotImplementedError:
+                    f.seek(0)
+                remaining = size
+                while remaining is None or remaining > 0:
+                    chunk = f.read(self.file_chunk_size if remaining is None else min(self.file_chunk_size, remaining))
+                    if not chunk:
+                        break
+                    writer.write(chunk)
+                    await writer.drain()
+                    if remaining is not None:
+                        remaining -= len(chunk)
+                return not remaining
+        except ConnectionError:
+            return False
+        except OSError:
+            logger.exception("Ошибка при отправке файла %s", path)
+            return False
+
+    async def _send_streaming(self, writer, response: StreamingResponse, keep_alive: bool, chunked: bool = True) -> bool:
+        """
+        Отправить тело StreamingResponse по мере готовности блоков
+
+        Заголовки к этому моменту уже ушли, поэтому при ошибке в генераторе
+        ответ обрывается без завершающего блока и соединение закрывается.
+        """
+        if chunked:
+            response.headers["transfer-encoding"] = "chunked"
+        self._write_head(writer, response, keep_alive)
+        try:
+            async for chunk in response.body_iterator:
+                if not isinstance(chunk, bytes):
+                    chunk = chunk.encode(response.charset)
+                if not chunk:
+                    continue
+                if chunked:
+                    writer.write(b"%x\r\n%b\r\n" % (len(chunk), chunk))
+                else:
+                    writer.write(chunk)
+                await writer.drain()
+        except ConnectionError:
+            return False
+        except Exception:
+            logger.exception("Ошибка при потоковой отдаче ответа")
+            return False
+        if chunked:
+            writer.write(b"0\r\n\r\n")
+        return True
+
+    def _write_response(self, writer, response: Response, keep_alive: bool) -> None:
+        body = response.body if hasattr(response, "body") else b""
+        if body and not isinstance(body, bytes):
+            body = body.encode()
+        if "content-length" not in response.headers and response.status_code not in (204, 304):
+            # Без длины тела клиент не сможет найти границу следующего ответа
+            response.headers["content-length"] = str(len(body))
+        self._write_head(writer, response, keep_alive)
+        if body:
+            writer.write(body)
+
+    def _write_head(self, writer, response: Response, keep_alive: bool) -> None:
+        response.headers["connection"] = "keep-alive" if keep_alive else "close"
 
-        async def run_server():
-            server = await asyncio.start_server(self._handle_client_compat, host, port)
-            logger.info(f"Server is ready: http://{host}:{port}")
-            async with server:
-                await server.serve_forever()
+        try:
+            reason = HTTPStatus(response.status_code).phrase
+        except ValueError:
+            reason = ""
+        status_line = f"HTTP/1.1 {response.status_code} {reason}\r\n".encode()
+        headers = b""
+        for key, value in response.headers.items():
+            headers += f"{key}: {value}\r\n".encode()
+        writer.write(status_line + headers + b"\r\n")
+
+    async def _run_server(self, host: str, port: int, sock=None, reuse_port: bool = False, graceful_timeout: float = 30.0):
+        """Обслуживать соединения до SIGTERM/SIGINT, затем дождаться активных запросов"""
+        loop = asyncio.get_running_loop()
+        stop = asyncio.Event()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass
 
-        asyncio.run(run_server())
+        if sock is not None:
+            server = await asyncio.start_server(self._handle_client_compat, sock=sock, limit=self.max_header_size)
+        else:
+            server = await asyncio.start_server(
+                self._handle_client_compat, host, port, limit=self.max_header_size, reuse_port=reuse_port or None
+            )
+        logger.info(f"Server is ready: http://{host}:{port} (pid {os.getpid()})")
+
+        async with server:
+            await stop.wait()
+            # Перестаём принимать новые соединения, keep-alive больше не продлевается
+            self._closing = True
+            server.close()
+            deadline = loop.time() + graceful_timeout
+            while self._connections and loop.time() < deadline:
+                await asyncio.sleep(0.1)
+
+    def start(
+        self,
+        host: str = "localhost",
+        port=3700,
+        workers: int = 1,
+        reuse_port: bool = False,
+        graceful_timeout: float = 30.0,
+    ):
+        # CSS и индекс статики готовятся в родителе до fork,
+        # воркеры получают их готовыми
+        self.ensure_css_generated()
+        if self.static_index is not None:
+            self.static_index.build()
+
+        if workers <= 1:
+            asyncio.run(self._run_server(host, port, reuse_port=reuse_port, graceful_timeout=graceful_timeout))
+            return
+
+        def serve(sock):
+            asyncio.run(self._run_server(host, port, sock=sock, reuse_port=reuse_port, graceful_timeout=graceful_timeout))
+
+        WorkerSupervisor(
+            target=serve,
+            workers=workers,
+            host=host,
+            port=port,
+            reuse_port=reuse_port,
+            graceful_timeout=graceful_timeout,
+        ).run()
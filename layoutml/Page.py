@@ -1,7 +1,10 @@
-import copy
+from itertools import islice
 from typing import Any, Optional
 
-from layoutml.base import BaseElement
+from layoutml.base import BaseElement, NameIndex, walk
+from layoutml.base.NameIndex import get_named
+from layoutml.base.css import CSSBase, format_css_rules, render_minify
+from layoutml.base.Observable import ChildAttribute, SharedParents, derives, iter_items
 from layoutml.layout import Layout
 from .Body import Body
 from .Head import Head
@@ -13,27 +16,173 @@ class Page(BaseElement):
     Объединяет Head и Body
     """
 
+    # Страниц немного, поэтому у них остаётся __dict__ для атрибутов,
+    # которые приложение добавляет само (например, для своих обработчиков)
+    __slots__ = (
+        "doctype",
+        "_head",
+        "_body",
+        "render_css_file",
+        "critical_elements",
+        "minify_css",
+        "_css_minified",
+        "_shared_changes",
+        "_html_bytes",
+        "unique_names",
+        "_names",
+        "__dict__",
+    )
+    _slot_defaults = (("_html_bytes", None), ("_names", None), ("_css_minified", False), ("_shared_changes", 0))
+
     object_type: str
 
     doctype: str
-    head: Head
-    body: Body
-
-    def __init__(self, object_name, doctype: str = "html", title: str = "LayoutML", lang="ru", **kwargs):
+    head: Head = ChildAttribute()
+    body: Body = ChildAttribute()
+
+    def __init__(
+        self,
+        object_name,
+        doctype: str = "html",
+        title: str = "LayoutML",
+        lang="ru",
+        unique_names: bool = False,
+        **kwargs,
+    ):
         super().__init__(tag="html", object_name=object_name, lang=lang, **kwargs)
 
         self.object_type = "Page"
         self.doctype = doctype
+        # Индекс имён элементов страницы (см. find), при unique_names=True
+        # повторяющееся имя вызывает ValueError при добавлении элемента
+        self.unique_names = unique_names
+        self._names = NameIndex(page=self)
         self.head = Head(title=title)
         self.body = Body()
 
         self.render_css_file = True
+        # Число первых элементов body, стили которых встраиваются в <style>
+        self.critical_elements: Optional[int] = None
+        # Минифицированные стили в <head> и атрибутах style при рендеринге
+        # страницы, None — общая настройка CSSBase.minify (см. LayoutML(minify_css=True))
+        self.minify_css: Optional[bool] = None
 
         self.head.set_icon("https://raw.githubusercontent.com/feed619/LayoutML/refs/heads/main/ico/logo.ico")
 
     def copy(self) -> "Page":
-        """Создать глубокую копию страницы"""
-        return copy.deepcopy(self)
+        """
+        Создать копию страницы
+
+        Копия делит с оригиналом head, body, элементы и их стили. Узел
+        копируется, когда копия выдаёт его: head и body, find(), get_element(),
+        индексация и перебор списков элементов (body.elements, layout.elements,
+        см. SharedList), атрибуты стилей и контейнеры скопированного узла.
+        Копируются только выданные узлы и путь к ним, поэтому копия стоит
+        O(числа затронутых узлов), а рендер неизменённой части берётся из
+        общего кэша. Изменения копии не затрагивают оригинал.
+
+        Изменения оригинала после копирования видны в копиях там, где копия
+        ещё делит узлы с оригиналом: копия не отдаёт устаревший кэш
+        (см. _check_shared). Узлы, которые копия уже скопировала, от оригинала
+        не зависят. Полностью независимую копию создаёт copy.deepcopy(page).
+        """
+        return self._copy_node()
+
+    def _copy_node(self) -> "Page":
+        clone = super()._copy_node()
+        # Индекс копируется при первом изменении дерева копии (см. _get_names)
+        object.__setattr__(clone, "_names", self._names)
+        object.__setattr__(clone, "_shared_changes", SharedParents.changes)
+        return clone
+
+    def _check_shared(self) -> None:
+        """
+        Сбросить кэши копии, если общие с оригиналом узлы изменились
+
+        Узлы копии, которые ссылаются на общие узлы, это узлы, скопированные
+        копией (связанные с ней): их кэши могут содержать прежний рендер
+        общих потомков. Изменение любого общего узла увеличивает счётчик
+        SharedParents.changes; пока он не менялся, проверка стоит O(1),
+        иначе обходятся только скопированные узлы.
+        """
+        changes = SharedParents.changes
+        if self._origin is None or self._shared_changes == changes:
+            return
+        object.__setattr__(self, "_shared_changes", changes)
+
+        def enter(node):
+            object.__setattr__(node, "_html_cache", None)
+            object.__setattr__(node, "_styles_cache", None)
+            object.__setattr__(node, "_styles_dirty", True)
+            return (
+                child
+                for child in iter_items(node._get_children())
+                if isinstance(child, BaseElement) and any(parent is node for parent in child._parents or ())
+            )
+
+        walk(self, enter)
+        object.__setattr__(self, "_html_bytes", None)
+
+    def _get_render(self, key):
+        self._check_shared()
+        return super()._get_render(key)
+
+    def collect_styles(self, table: list, space: bool = True, atomic: bool = False) -> None:
+        self._check_shared()
+        super().collect_styles(table, space, atomic)
+
+    def _get_state(self) -> dict:
+        state = super()._get_state()
+        # Индекс хранит узлы по id: deepcopy и pickle строят его заново (_link_children)
+        state.pop("_names", None)
+        return state
+
+    def _link_children(self) -> None:
+        super()._link_children()
+        self._names = NameIndex.build(self)
+
+    def _get_names(self) -> NameIndex:
+        """Индекс имён, принадлежащий странице, для изменения"""
+        names = self._names
+        if names.page is not self:
+            names = self._names = NameIndex(names, page=self, shared=True)
+        return names
+
+    def _change_names(self, added: list, removed: list) -> None:
+        if not added and not removed:
+            return
+        if self.unique_names:
+            self._names.check_unique(added, removed)
+        self._get_names().apply(added, removed)
+
+    def _update_names(self, added, removed) -> None:
+        self._change_names(get_named(added), get_named(removed))
+
+    def _rename_element(self, element: BaseElement, name: str) -> None:
+        old = element.object_name
+        added = [(name, element)] if element._is_indexed_name(name) else []
+        removed = [(old, element)] if element._is_indexed_name(old) else []
+        self._change_names(added, removed)
+
+    def find(self, object_name: str) -> Optional[BaseElement]:
+        """
+        Элемент с именем object_name на любом уровне вложенности или None
+
+        Элемент ищется по индексу имён страницы за O(1). Индекс обновляется
+        при добавлении, удалении и переименовании элементов. Индексируются
+        явно заданные имена, отличные от типа элемента (object_type).
+        Имя, которое носят несколько элементов, вызывает ValueError: такие
+        элементы ищутся через их контейнер (Layout.get_element).
+
+        В копии страницы (copy) найденный элемент и путь к нему копируются,
+        как при get_element.
+        """
+        element = self._names.get(object_name)
+        if type(element) is dict:
+            raise ValueError(f"Имя '{object_name}' носят {len(element)} элемента страницы")
+        if element is None or self._origin is None:
+            return element
+        return self._own_descendant(element)[1]
 
     def set_head(self, head: Head) -> "Page":
         self.head = head
@@ -55,6 +204,32 @@ class Page(BaseElement):
         self.add_attributes(lang=lang)
         return self
 
+    def set_critical_css(self, count: int) -> "Page":
+        """
+        Встраивать в <style> стили первых count элементов body
+
+        Остальная таблица стилей страницы загружается без блокировки
+        отрисовки (см. Head.add_deferred_stylesheet).
+        """
+        self.critical_elements = count
+        return self
+
+    def get_critical_styles(self, count: Optional[int] = None, space: bool = True, atomic: bool = False) -> dict:
+        """
+        Стили body и первых count элементов body: {селектор: стили}
+
+        Правила идут в порядке полной таблицы стилей страницы и берутся из неё.
+        """
+        self._check_shared()
+        if count is None:
+            count = self.critical_elements or 0
+        table = list(self._body._get_own_styles(space, atomic).items())
+        for element in islice(iter_items(self._body.elements), count):
+            if hasattr(element, "collect_styles"):
+                element.collect_styles(table, space, atomic)
+        critical = dict(table)
+        return {selector: css for selector, css in self.get_styles(space, atomic).items() if selector in critical}
+
     def add_stylesheet(self, href: str, media: str = "all") -> "Head":
         """Добавить CSS файл"""
         self.head.add_link(rel="stylesheet", href=href, media=media)
@@ -78,15 +253,33 @@ class Page(BaseElement):
         return self
 
     def get_element(self, object_name: str) -> Layout | BaseElement:
-        for element in self.body.elements:
+        """
+        Элемент body с именем object_name на любом уровне вложенности
+
+        Поиск идёт по индексу имён (см. find). Из нескольких элементов
+        с одним именем выбирается элемент верхнего уровня body, затем
+        первый добавленный.
+        """
+        body = self.body
+        element = body._find_descendant(object_name)[1]
+        if element is not None:
+            return element
+        # Имена типов не индексируются: ищем среди элементов body
+        for index, element in enumerate(iter_items(body.elements)):
             if element.get_object_name() == object_name:
-                return element
+                return body._own_item(body.elements, index)
         raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{object_name}'")
 
     def remove_element(self, object_name: str) -> None:
-        for index in range(len(self.body.elements)):
-            if self.body.elements[index].get_object_name() == object_name:
-                return self.body.elements.pop(index)
+        """Удалить элемент с именем object_name из его контейнера, поиск как в get_element"""
+        parent, element = self.body._find_descendant(object_name)
+        if element is not None and isinstance(parent._get_children(), list):
+            parent._get_children().remove(element)
+            return element
+        elements = self.body.elements
+        for index, element in enumerate(iter_items(elements)):
+            if element.get_object_name() == object_name:
+                return elements.pop(index)
 
     def _get_doctype(self) -> str:
         """Получить строку doctype"""
@@ -100,12 +293,7 @@ class Page(BaseElement):
         return doctypes.get(self.doctype, "<!DOCTYPE html>")
 
     def get_css_text(self) -> str:
-        css_styles: dict = self.body.get_styles()
-        css_text: str = ""
-        for selector_name, css in css_styles.items():
-            css_text += f"{selector_name} " + "{\n" + css + "}\n"
-
-        return css_text
+        return format_css_rules(self._body.get_styles())
 
     def render(self) -> str:
         """Рендеринг полного HTML документа"""
@@ -119,28 +307,81 @@ class Page(BaseElement):
 
         return self.get_html()
 
-    def get_styles(self):
+    def _get_children(self):
+        return (self._head, self._body)
 
-        css_styles: dict = {}
-        css_styles.update(super().get_styles())
-        css_styles.update(self.head.get_styles())
-        css_styles.update(self.body.get_styles())
-
-        return css_styles
+    def _own_child(self, child):
+        if derives(self._head, child):
+            return self.head
+        if derives(self._body, child):
+            return self.body
+        return None
 
     def get_html(self):
-        parts = []
-        parts.append(self._get_doctype())
-
-        attrs = self.get_attributes_string()
-        parts.append(f"<{self.tag} {attrs}>")
+        return self._render_str()
 
-        parts.append(self.head.get_html())
-        parts.append(self.body.get_html())
+    def _begin_render(self) -> bool:
+        """
+        Режим минификации стилей для рендеринга страницы
 
-        parts.append("</html>")
+        Кэш рендера поддерева зависит от режима: если режим изменился с
+        прошлого рендеринга, кэши всех узлов страницы сбрасываются.
+        """
+        minify = CSSBase.minify if self.minify_css is None else self.minify_css
+        if minify != self._css_minified:
+
+            def enter(node):
+                if not isinstance(node, BaseElement):
+                    return None
+                object.__setattr__(node, "_html_cache", None)
+                return iter_items(node._get_children())
+
+            walk(self, enter)
+            object.__setattr__(self, "_css_minified", minify)
+        return minify
+
+    def render_into(self, buf: list, tab: int = 0) -> None:
+        token = render_minify.set(self._begin_render())
+        try:
+            super().render_into(buf, tab)
+        finally:
+            render_minify.reset(token)
+
+    def iter_html(self, tab: int = 0):
+        # Режим минификации действует только на шагах рендеринга страницы:
+        # между фрагментами управление возвращается вызывающей стороне
+        minify = self._begin_render()
+        fragments = super().iter_html(tab)
+        while True:
+            token = render_minify.set(minify)
+            try:
+                fragment = next(fragments, None)
+            finally:
+                render_minify.reset(token)
+            if fragment is None:
+                return
+            yield fragment
+
+    def _iter_fragments(self, tab: int = 0):
+        # doctype и <head> отдаются первым фрагментом, затем body по частям
+        yield f"{self._get_doctype()}\n<{self.tag} {self.get_attributes_string()}>\n{self._head.get_html()}\n"
+        yield self._body
+        yield "\n</html>"
+
+    def get_html_bytes(self, encoding: str = "utf-8") -> bytes:
+        """
+        HTML документа в виде байт
 
-        return "\n".join(parts)
+        Пока страница не менялась, get_html() возвращает закэшированную строку,
+        а здесь переиспользуются уже закодированные байты.
+        """
+        html = self.get_html()
+        cached = self._html_bytes
+        if cached is not None and cached[0] is html and cached[1] == encoding:
+            return cached[2]
+        html_bytes = html.encode(encoding)
+        self._html_bytes = (html, encoding, html_bytes)
+        return html_bytes
 
     def save(self, filename: str, encoding: str = "utf-8") -> None:
         """Сохранить документ в файл"""
@@ -152,4 +393,4 @@ class Page(BaseElement):
         return self.get_html()
 
     def __repr__(self) -> str:
-        return f'{self.get_object_name()}", title="{self.head.title}")'
+        return f'{self.get_object_name()}", title="{self._head.title}")'
@@ -0,0 +1,52 @@
+import os
+import sys
+import argparse
+import importlib
+
+from .LayoutML import LayoutML, CSS_MANIFEST_NAME
+
+
+def load_app(target: str) -> LayoutML:
+    """Найти приложение по строке вида "module:attribute" (по умолчанию attribute = app)"""
+    module_name, _, attribute = target.partition(":")
+    if os.getcwd() not in sys.path:
+        sys.path.insert(0, os.getcwd())
+    module = importlib.import_module(module_name)
+    app = getattr(module, attribute or "app", None)
+    if not isinstance(app, LayoutML):
+        raise SystemExit(f"'{target}' не является приложением LayoutML")
+    return app
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m layoutml", description="Инструменты LayoutML")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Сгенерировать CSS и манифест заранее")
+    build.add_argument("app", help='Приложение в виде "module:attribute", например main:app')
+    build.add_argument("--outdir", default=".", help="Каталог для файлов стилей и манифеста")
+    build.add_argument("--manifest", default=CSS_MANIFEST_NAME, help="Имя файла манифеста")
+
+    export = commands.add_parser("export", help="Экспортировать приложение в статический сайт")
+    export.add_argument("app", help='Приложение в виде "module:attribute", например main:app')
+    export.add_argument("--outdir", default="dist", help="Каталог для HTML, CSS и манифеста")
+    export.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Число процессов рендеринга")
+
+    args = parser.parse_args(argv)
+    if args.command == "build":
+        app = load_app(args.app)
+        manifest = app.build(args.outdir, manifest_name=args.manifest)
+        files = {name for entry in manifest["pages"].values() for name in entry["stylesheets"]}
+        print(f"Собрано файлов стилей: {len(files)}, манифест: {os.path.join(args.outdir, args.manifest)}")
+    elif args.command == "export":
+        app = load_app(args.app)
+        manifest = app.export(args.outdir, workers=args.workers)
+        print(f"Экспортировано страниц: {len(manifest['pages'])}, пропущено маршрутов: {len(manifest['skipped'])}")
+        if manifest["errors"]:
+            print(f"Ошибки: {len(manifest['errors'])}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
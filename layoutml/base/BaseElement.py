@@ -1,12 +1,84 @@
+from functools import wraps
+
 from layoutml.base import HTMLElement
-from layoutml.base.css import CSSBase, CSSSelectors
+from layoutml.base.css import CSSBase, CSSSelectors, atomic_class_name
+from .Observable import ChildAttribute, LazyAttribute, derives, iter_items
+from .Traversal import walk
+from layoutml.template import CompiledTemplate
+
+
+def _cached_render(get_html):
+    """
+    Кэширует результат get_html самого производного класса
+
+    Вызовы super().get_html(...) из подклассов идут мимо кэша: они строят
+    промежуточный результат. Кэш сбрасывается при любом изменении элемента
+    или его потомков (см. Observable._invalidate). Контейнеры, отрендеренные
+    через render_into, хранят в кэше кортеж фрагментов; он склеивается
+    в строку при первом обращении к get_html.
+    """
+
+    @wraps(get_html)
+    def wrapper(self, *args, **kwargs):
+        if type(self).get_html is not wrapper:
+            return get_html(self, *args, **kwargs)
+        key = (args, tuple(kwargs.items())) if args or kwargs else None
+        if self._html_cache is not None:
+            html = self._get_render(key)
+            if html is not None:
+                if type(html) is tuple:
+                    html = "".join(html)
+                    self._store_render(key, html)
+                return html
+        html = get_html(self, *args, **kwargs)
+        if key is None and type(self._html_cache) is not dict:
+            # То же, что _store_render, без лишнего вызова на каждый элемент
+            _set_html_cache(self, html)
+        else:
+            self._store_render(key, html)
+        return html
+
+    return wrapper
 
 
 class BaseElement(HTMLElement):
-    object_styles: CSSBase
-    selectors_styles: CSSSelectors
+    __slots__ = (
+        "tag",
+        "self_closing",
+        "_object_styles",
+        "_selectors_styles",
+        "_html_cache",
+        "_styles_cache",
+        "_styles_dirty",
+        "_atomic_class",
+        "_origin",
+    )
+
+    object_styles: CSSBase = LazyAttribute(CSSBase)
+    selectors_styles: CSSSelectors = LazyAttribute(CSSSelectors)
     tag: str
 
+    _cacheable = True
+    _slot_defaults = (
+        ("_html_cache", None),
+        ("_styles_cache", None),
+        ("_styles_dirty", True),
+        ("_atomic_class", None),
+        ("_origin", None),
+    )
+    _style_fields = frozenset(
+        {"object_styles", "selectors_styles", "class_", "object_name", "object_type", "elements", "items", "head", "body"}
+    )
+    _child_fields = frozenset({"elements", "items", "head", "body"})
+    # Индекс имён есть только у страницы (см. Page, NameIndex)
+    _names = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "get_html" in cls.__dict__:
+            cls._get_html_uncached = cls.__dict__["get_html"]
+            cls.get_html = _cached_render(cls.__dict__["get_html"])
+
     def __init__(
         self,
         tag="",
@@ -19,29 +91,403 @@ class BaseElement(HTMLElement):
         super().__init__(object_name=object_name, style=style, boolean_attributes=boolean_attributes, **kwargs)
 
         self.self_closing = self_closing
-        self.selectors_styles: CSSSelectors = CSSSelectors()
-        self.object_styles: CSSBase = CSSBase()
         self.tag = tag
 
+    def _get_open_tag(self) -> str:
+        # Имя и класс по умолчанию пишутся в слоты напрямую: элемент сейчас
+        # рендерится, сбрасывать его кэш и кэш предков незачем, а имя типа
+        # не попадает в индекс имён (см. _is_indexed_name). Класс хранится
+        # кортежем, список создаст LazyAttribute при первом обращении к class_
+        if not self.object_name:
+            _set_object_name(self, self.object_type)
+        if not self._class_:
+            _set_class(self, (self.object_name,))
+        return f"<{self.tag} {self.get_attributes_string()}>"
+
+    def _get_cached_html(self):
+        """HTML из кэша для вызова get_html() без аргументов или None"""
+        html = self._get_render(None)
+        if type(html) is tuple:
+            html = "".join(html)
+            self._store_render(None, html)
+        return html
+
+    @_cached_render
     def get_html(self, content: str = "", tab: int = 0):
+        return self._get_tag_html(content, tab)
+
+    def _get_tag_html(self, content: str = "", tab: int = 0) -> str:
+        """
+        Разметка тега с содержимым content без кэша
+
+        Листовые элементы вызывают её из своего get_html вместо
+        super().get_html(...): вызов не проходит через обёртку кэша
+        родительского класса (см. _cached_render).
+        """
+        # Открывающий тег собирается на месте так же, как в _get_open_tag:
+        # листовых элементов в дереве больше всего, лишний вызов заметен
         if not self.object_name:
-            self.object_name = self.object_type
-        if not self.class_:
-            self.add_class(self.object_name)
-        attrs = self.get_attributes_string()
+            _set_object_name(self, self.object_type)
+        if not self._class_:
+            _set_class(self, (self.object_name,))
+        open_tag = f"<{self.tag} {self.get_attributes_string()}>"
         if content:
             content += "\n"
         if self.self_closing:
-            return f"<{self.tag} {attrs}>"
-        return f"<{self.tag} {attrs}>{content}{'    '*tab}</{self.tag}>"
-
-    def get_styles(self, space: bool = True):
-        if self.object_styles:
-            if not self.class_:
-                self.add_class(self.get_object_name())
-            class_name = " ".join(self.class_)
-            if not self.selectors_styles.selector_exists(name=class_name):
-                self.selectors_styles.add_selector(name=class_name, selector_type="class")
-            self.selectors_styles.add_styles(class_name, dict(self.object_styles))
+            return open_tag
+        return f"{open_tag}{content}{'    '*tab}</{self.tag}>"
+
+    # Контейнеры определяют генератор _iter_fragments(tab), который отдаёт
+    # строки разметки и дочерние элементы; листовые элементы рендерятся
+    # через get_html
+    _iter_fragments = None
+
+    # Дочерние элементы контейнера рендерятся с отступом на уровень больше
+    # его собственного (ListElement), иначе без отступа
+    _indent_children = False
+
+    def _render_str(self, tab: int = 0) -> str:
+        buf = []
+        self.render_into(buf, tab)
+        return "".join(buf)
+
+    def _iter_render(self, buf: list, tab: int):
+        """
+        Генератор, который пишет в buf HTML контейнера без кэша
+
+        Дерево обходится в глубину с явным стеком, как в walk, но без функций
+        enter и exit: на контейнер приходится один кадр стека. Фрагменты
+        контейнера (_iter_fragments) разбираются на месте: строки,
+        закэшированные и листовые элементы сразу дописываются в buf, в стек
+        попадают только контейнеры, которые нужно отрендерить. После обхода
+        потомков контейнер кэширует кортеж своих фрагментов. Генератор
+        отдаёт управление после входа в каждый контейнер (см. iter_html).
+        """
+        # Открытый контейнер, его отступ, начало его фрагментов в buf,
+        # фрагменты и отступ дочерних элементов; кадры внешних контейнеров
+        # лежат в стеке
+        node = self
+        start = len(buf)
+        fragments = iter(node._iter_fragments(tab))
+        child_tab = tab + 1 if node._indent_children else 0
+        stack = []
+        append = buf.append
+        yield
+        while True:
+            child_key = ((), (("tab", child_tab),)) if child_tab else None
+            for fragment in fragments:
+                if type(fragment) is str:
+                    append(fragment)
+                elif not isinstance(fragment, BaseElement):
+                    # Объекты разметки вне дерева элементов (Slot) рендерятся сами
+                    fragment.render_into(buf, child_tab)
+                elif fragment._html_cache is None:
+                    if fragment._iter_fragments is not None:
+                        break
+                    if child_tab:
+                        append(fragment.get_html(tab=child_tab))
+                    else:
+                        # Листовой элемент без кэша рендерится без обёртки
+                        # get_html (см. _cached_render), результат кэшируется
+                        # так же, как это сделала бы обёртка
+                        html = fragment._get_html_uncached()
+                        _set_html_cache(fragment, html)
+                        append(html)
+                else:
+                    cached = fragment._get_render(child_key)
+                    if cached is None:
+                        if fragment._iter_fragments is not None:
+                            break
+                        append(fragment.get_html(tab=child_tab) if child_tab else fragment.get_html())
+                    elif type(cached) is tuple:
+                        buf.extend(cached)
+                    else:
+                        append(cached)
+            else:
+                # Фрагменты контейнера закончились: он кэшируется, обход
+                # возвращается к внешнему контейнеру
+                html = tuple(buf[start:])
+                if tab:
+                    node._store_render(((), (("tab", tab),)), html)
+                elif node._html_cache is None:
+                    _set_html_cache(node, html)
+                else:
+                    node._store_render(None, html)
+                if not stack:
+                    return
+                node, tab, start, fragments, child_tab = stack.pop()
+                continue
+            # Вход в дочерний контейнер
+            stack.append((node, tab, start, fragments, child_tab))
+            node = fragment
+            tab = child_tab
+            start = len(buf)
+            fragments = iter(node._iter_fragments(tab))
+            child_tab = tab + 1 if node._indent_children else 0
+            yield
+
+    def _render_cached(self, buf: list, tab: int) -> bool:
+        """Дописать в buf HTML элемента из кэша или листового элемента; False для контейнера без кэша"""
+        cached = self._get_render(((), (("tab", tab),)) if tab else None)
+        if cached is not None:
+            if type(cached) is tuple:
+                buf.extend(cached)
+            else:
+                buf.append(cached)
+            return True
+        if self._iter_fragments is None:
+            buf.append(self.get_html(tab=tab) if tab else self.get_html())
+            return True
+        return False
+
+    def render_into(self, buf: list, tab: int = 0) -> None:
+        """
+        Дописать HTML элемента в общий буфер фрагментов
+
+        Все уровни дерева пишут в один список, строка собирается один раз
+        вызывающей стороной. Контейнер кэширует кортеж своих фрагментов:
+        повторный рендер неизменённого поддерева копирует ссылки, а не байты.
+        Дерево обходится без рекурсии (см. _iter_render), глубина
+        вложенности не ограничена.
+        """
+        if not self._render_cached(buf, tab):
+            for _ in self._iter_render(buf, tab):
+                pass
+
+    def iter_html(self, tab: int = 0):
+        """
+        Генератор фрагментов HTML в порядке обхода в глубину
+
+        Неизменённый элемент отдаётся из кэша. Фрагменты отдаются по мере
+        обхода дерева (см. _iter_render), контейнеры по завершении кэшируют
+        результат так же, как render_into.
+        """
+        buf = []
+        if self._render_cached(buf, tab):
+            yield from buf
+            return
+        sent = 0
+        for _ in self._iter_render(buf, tab):
+            if len(buf) > sent:
+                yield from buf[sent:]
+                sent = len(buf)
+        yield from buf[sent:]
+
+    def compile(self) -> CompiledTemplate:
+        """
+        Скомпилировать элемент в шаблон
+
+        Статическая разметка рендерится один раз и хранится в байтах,
+        на месте объектов Slot остаются именованные динамические места.
+        """
+        return CompiledTemplate(self)
+
+    def _get_own_styles(self, space: bool = True, atomic: bool = False) -> dict:
+        """Стили самого элемента без потомков"""
+        if not self._object_styles:
+            return self._selectors_styles.get_styles(space=space) if self._selectors_styles else {}
+
+        if not self._class_:
+            self.add_class(self.get_object_name())
+
+        if atomic:
+            # Стили элемента выносятся в класс с именем из хэша содержимого,
+            # элементы с одинаковыми стилями делят одно правило
+            class_name = atomic_class_name(self.object_styles.get_styles_string())
+            if self._atomic_class != class_name:
+                if self._atomic_class:
+                    self.del_class(self._atomic_class)
+                self.add_class(class_name)
+                self._atomic_class = class_name
+            css_styles = self._selectors_styles.get_styles(space=space) if self._selectors_styles else {}
+            css_styles[f".{class_name}"] = self.object_styles.get_styles_string(space=space)
+            return css_styles
+
+        class_name = " ".join(self.class_)
+        if not self.selectors_styles.selector_exists(name=class_name):
+            self.selectors_styles.add_selector(name=class_name, selector_type="class")
+        self.selectors_styles.add_styles(class_name, dict(self.object_styles))
 
         return self.selectors_styles.get_styles(space=space)
+
+    def _get_children(self):
+        """Дочерние узлы контейнера: элементы, строки и другие объекты разметки"""
+        return ()
+
+    def _get_style_children(self):
+        """Дочерние элементы, стили которых входят в стили элемента"""
+        return self._get_children()
+
+    def collect_styles(self, table: list, space: bool = True, atomic: bool = False) -> None:
+        """
+        Дописать стили поддерева в общую таблицу пар (селектор, стили)
+
+        Дерево обходится один раз без рекурсии (см. walk), все уровни пишут
+        в один список. Результат поддерева запоминается и используется
+        повторно, пока в нём не изменятся стили, классы или состав элементов.
+
+        При atomic=True стили элементов выносятся в атомарные классы
+        (см. atomic_class_name), которые добавляются элементам.
+        """
+        key = (space, atomic)
+        cache = self._styles_cache
+        if cache is not None and key in cache:
+            table.extend(cache[key])
+            return
+        # Начало стилей открытых элементов в table
+        starts = []
+
+        def children(nodes):
+            for child in iter_items(nodes):
+                if not isinstance(child, BaseElement):
+                    if hasattr(child, "collect_styles"):
+                        child.collect_styles(table, space, atomic)
+                    continue
+                cache = child._styles_cache
+                if cache is not None and key in cache:
+                    table.extend(cache[key])
+                    continue
+                grandchildren = child._get_style_children()
+                if grandchildren:
+                    yield child, grandchildren
+                    continue
+                # Листовой элемент собирается без обхода
+                start = len(table)
+                table.extend(child._get_own_styles(space, atomic).items())
+                child._store_styles(key, tuple(table[start:]))
+
+        def enter(item):
+            starts.append(len(table))
+            table.extend(item[0]._get_own_styles(space, atomic).items())
+            return children(item[1])
+
+        def exit(item):
+            item[0]._store_styles(key, tuple(table[starts.pop():]))
+
+        walk((self, self._get_style_children()), enter, exit)
+
+    def get_styles(self, space: bool = True, atomic: bool = False) -> dict:
+        """
+        Стили элемента и его потомков: {селектор: стили}
+
+        Повторяющийся селектор остаётся на месте первого появления
+        со стилями из последнего.
+        """
+        table = []
+        self.collect_styles(table, space, atomic)
+        return dict(table)
+
+    def _is_indexed_name(self, name) -> bool:
+        """
+        Попадает ли элемент с именем name в индекс имён страницы
+
+        Индексируются только явно заданные имена: имя типа (object_type)
+        носят все безымянные элементы после рендера.
+        """
+        return bool(name) and name != self.object_type
+
+    def _get_pages(self) -> list:
+        """Страницы, в дерево которых входит узел, по ссылкам на предков"""
+        pages = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node._names is not None:
+                pages.append(node)
+            if node._parents:
+                stack.extend(node._parents)
+        return pages
+
+    def _children_changing(self, added, removed) -> None:
+        if self._parents is None and self._names is None:
+            return
+        for page in self._get_pages():
+            page._update_names(added, removed)
+
+    def _replace_children(self, name: str, value) -> None:
+        """Сообщить индексу имён о замене дочерних узлов в атрибуте name"""
+        attribute = getattr(type(self), name, None)
+        old = getattr(self, attribute.slot_name if isinstance(attribute, ChildAttribute) else name, None)
+        self._children_changing(_as_nodes(value), _as_nodes(old))
+
+    def _renaming(self, name) -> None:
+        if not self._is_indexed_name(self.object_name) and not self._is_indexed_name(name):
+            return
+        for page in self._get_pages():
+            page._rename_element(self, name)
+
+    def _own_child(self, child):
+        """Дочерний узел child или его копия, принадлежащие узлу (см. _own), или None"""
+        items = self._get_children()
+        try:
+            index = items.index(child)
+        except ValueError:
+            for index, item in enumerate(iter_items(items)):
+                if isinstance(item, BaseElement) and derives(item, child):
+                    break
+            else:
+                return None
+        return self._own_item(items, index)
+
+    def _own_descendant(self, element) -> tuple:
+        """
+        (родитель, элемент) для потомка element, принадлежащего узлу, или (None, None)
+
+        Путь от element к узлу идёт по ссылкам на предков. Если он приводит
+        к оригиналу копии (см. Page.copy), узлы пути копируются сверху вниз
+        так же, как при обращении к ним через копию.
+        """
+        path = [element]
+        while True:
+            parents = path[-1]._parents
+            if not parents:
+                return None, None
+            parent = parents[0]
+            if parent is self:
+                return (path[1] if len(path) > 1 else self), element
+            if derives(self, parent):
+                owner = self
+                for node in reversed(path):
+                    parent = owner
+                    owner = owner._own_child(node)
+                    if owner is None:
+                        return None, None
+                return parent, owner
+            path.append(parent)
+
+    def _find_descendant(self, name: str) -> tuple:
+        """
+        (родитель, элемент) с именем name в поддереве узла или (None, None)
+
+        Кандидаты берутся из индекса имён страницы. Если имя повторяется,
+        сначала проверяются дочерние элементы узла, затем кандидаты в порядке
+        добавления.
+        """
+        candidates = [element for page in self._get_pages() for element in page._names.get_all(name)]
+        if len(candidates) > 1:
+            for child in iter_items(self._get_children()):
+                if isinstance(child, BaseElement) and child.object_name == name:
+                    return self, self._own_child(child)
+        for element in candidates:
+            found = self._own_descendant(element)
+            if found[1] is not None:
+                return found
+        return None, None
+
+
+# Запись слотов на горячем пути рендера: object.__setattr__ при каждом вызове
+# проверяет тип объекта, дескриптор слота пишет значение напрямую
+_set_html_cache = BaseElement.__dict__["_html_cache"].__set__
+_set_class = HTMLElement.__dict__["_class_"].__set__
+_set_object_name = HTMLElement.__dict__["object_name"].__set__
+
+
+BaseElement._get_html_uncached = BaseElement.get_html.__wrapped__
+
+
+def _as_nodes(value) -> tuple | list:
+    if value is None:
+        return ()
+    if isinstance(value, (list, tuple)):
+        return value
+    return (value,)
@@ -1,45 +1,62 @@
 from layoutml.html_core.HTMLAttributes import ValueAttributes
 from .css import CSSInline
+from .Observable import Observable, LazyAttribute, EMPTY_DICT, EMPTY_LIST
 
 
-class HTMLElement:
+class HTMLElement(Observable):
+
+    __slots__ = (
+        "object_name",
+        "object_type",
+        "_inline_styles",
+        "_class_",
+        "_events",
+        "_aria_attrs",
+        "_data_attrs",
+        "_value_attributes",
+        "_custom_attributes",
+        "_boolean_attributes",
+    )
 
     object_name: str
     object_type: str
 
-    class_: list[str]
-    events: dict
-    aria_attrs: dict
-    data_attrs: dict
-    value_attributes: dict
-    custom_attributes: dict
-    boolean_attributes: list
+    # Контейнеры создаются при первом обращении, до этого в слотах "_" + имя
+    # лежат общие пустые значения (см. LazyAttribute)
+    inline_styles = LazyAttribute(CSSInline)
+    class_: list[str] = LazyAttribute(list, EMPTY_LIST)
+    events: dict = LazyAttribute(dict, EMPTY_DICT)
+    aria_attrs: dict = LazyAttribute(dict, EMPTY_DICT)
+    data_attrs: dict = LazyAttribute(dict, EMPTY_DICT)
+    value_attributes: dict = LazyAttribute(dict, EMPTY_DICT)
+    custom_attributes: dict = LazyAttribute(dict, EMPTY_DICT)
+    boolean_attributes: list = LazyAttribute(list, EMPTY_LIST)
 
     def __init__(self, object_name=None, style=None, boolean_attributes=[], **kwargs):
 
-        self.inline_styles = CSSInline(style=style)
-
-        self.custom_attributes = {}
-        self.events = {}
-        self.class_ = []
+        if style:
+            self.inline_styles = CSSInline(style=style)
 
         self.object_name = object_name
         self.object_type = "HTMLElement"
 
-        self.boolean_attributes = boolean_attributes if type(boolean_attributes) is list else []
+        if boolean_attributes and type(boolean_attributes) is list:
+            self.boolean_attributes = boolean_attributes
 
         if "class_" in kwargs:
-            self.class_ = kwargs.get("class_", "").split()
-            del kwargs["class_"]
-        self.aria_attrs = {k[5:]: v for k, v in kwargs.items() if k.startswith("aria_")}
-        self.data_attrs = {k[5:]: v for k, v in kwargs.items() if k.startswith("data_")}
-        if self.aria_attrs:
-            for key in self.aria_attrs:
+            self.class_ = kwargs.pop("class_").split()
+        aria_attrs = {k[5:]: v for k, v in kwargs.items() if k.startswith("aria_")}
+        data_attrs = {k[5:]: v for k, v in kwargs.items() if k.startswith("data_")}
+        if aria_attrs:
+            self.aria_attrs = aria_attrs
+            for key in aria_attrs:
                 del kwargs[f"aria_{key}"]
-        if self.data_attrs:
-            for key in self.data_attrs:
+        if data_attrs:
+            self.data_attrs = data_attrs
+            for key in data_attrs:
                 del kwargs[f"data_{key}"]
-        self.value_attributes: dict = kwargs
+        if kwargs:
+            self.value_attributes = kwargs
 
     def set_object_name(self, name):
         self.object_name = name
@@ -57,7 +74,7 @@ class HTMLElement:
             Название CSS класса для добавления
 
         """
-        if classname not in self.class_:
+        if classname not in self._class_:
             self.class_.append(classname)
 
     def del_class(self, classname):
@@ -70,7 +87,7 @@ class HTMLElement:
             Название CSS класса для удаления
 
         """
-        if classname in self.class_:
+        if classname in self._class_:
             self.class_.remove(classname)
 
     def add_event(self, event_name, handler):
@@ -92,7 +109,7 @@ class HTMLElement:
         self.events[event_name] = handler
 
     def del_event(self, event_name):
-        if event_name in self.events:
+        if event_name in self._events:
             del self.events[event_name]
 
     def add_aria(self, key, value):
@@ -115,7 +132,7 @@ class HTMLElement:
         """
         Удаляет aria атрибут
         """
-        if key in self.aria_attrs:
+        if key in self._aria_attrs:
             del self.aria_attrs[key]
 
     def add_data(self, key, value):
@@ -140,25 +157,25 @@ class HTMLElement:
         """
         Удаляет data атрибут
         """
-        if key in self.data_attrs:
+        if key in self._data_attrs:
             del self.data_attrs[key]
 
     def add_attributes(self, boolean_attributes=[], **kwargs):
         for atr in boolean_attributes:
-            if not atr in self.boolean_attributes:
+            if not atr in self._boolean_attributes:
                 self.boolean_attributes.append(atr)
         for key, value in kwargs.items():
             if key == "class_":
-                if value not in self.class_:
+                if value not in self._class_:
                     self.class_.append(value)
             else:
                 self.value_attributes[key] = value
 
     def del_attributes(self, *args):
         for atr in args:
-            if atr in self.value_attributes:
+            if atr in self._value_attributes:
                 del self.value_attributes[atr]
-            if atr in self.boolean_attributes:
+            if atr in self._boolean_attributes:
                 self.boolean_attributes.remove(atr)
 
     def get_attributes_string(self):
@@ -170,36 +187,48 @@ class HTMLElement:
         str
             Строка атрибутов, готовая для вставки в HTML-тег
         """
+        # Контейнеры читаются из слотов, чтобы не создавать пустые
+        if not (
+            self._inline_styles
+            or self._events
+            or self._boolean_attributes
+            or self._data_attrs
+            or self._aria_attrs
+            or self._value_attributes
+        ):
+            # У большинства элементов есть только класс
+            return f'class="{" ".join(self._class_)}"' if self._class_ else ""
         attrs = []
-        if self.class_:
-            attrs.append(f'class="{" ".join(self.class_)}"')
-        if self.inline_styles:
-            attrs.append(self.inline_styles.get_styles_str())
-        if self.events:
-            for event, handler in self.events.items():
+        if self._class_:
+            attrs.append(f'class="{" ".join(self._class_)}"')
+        if self._inline_styles:
+            attrs.append(self._inline_styles.get_styles_str())
+        if self._events:
+            for event, handler in self._events.items():
                 attrs.append(f'{event}="{handler}"')
         # Булевые атрибуты
-        if self.boolean_attributes:
-            for bool_atr in self.boolean_attributes:
+        if self._boolean_attributes:
+            for bool_atr in self._boolean_attributes:
                 attrs.append(bool_atr)
         # data-* атрибуты
-        if self.data_attrs:
-            for key, value in self.data_attrs.items():
+        if self._data_attrs:
+            for key, value in self._data_attrs.items():
                 attrs.append(f'data-{key}="{value}"')
         # aria-* атрибуты
-        if self.aria_attrs:
-            for key, value in self.aria_attrs.items():
+        if self._aria_attrs:
+            for key, value in self._aria_attrs.items():
                 attrs.append(f'aria-{key}="{value}"')
-        for key, value in self.value_attributes.items():
-            if key == "class_":
-                key = "class"
-            # try:
-            #     atr_name = getattr(ValueAttributes, key)
-            # except AttributeError:
-            #     raise AttributeError(
-            #         f"Attribute '{key}' not found in HTMLElementAttributes class. "
-            #         f"Available attributes are defined in the HTMLElementAttributes class."
-            #     )
-            attrs.append(f'{key}="{value}"')
+        if self._value_attributes:
+            for key, value in self._value_attributes.items():
+                if key == "class_":
+                    key = "class"
+                # try:
+                #     atr_name = getattr(ValueAttributes, key)
+                # except AttributeError:
+                #     raise AttributeError(
+                #         f"Attribute '{key}' not found in HTMLElementAttributes class. "
+                #         f"Available attributes are defined in the HTMLElementAttributes class."
+                #     )
+                attrs.append(f'{key}="{value}"')
 
         return " ".join(attrs)
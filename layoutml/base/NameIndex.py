@@ -0,0 +1,127 @@
+from typing import Iterable, List, Tuple
+
+from .BaseElement import BaseElement
+from .Observable import derives, iter_items
+from .Traversal import walk
+
+
+def get_named(nodes: Iterable) -> List[Tuple[str, BaseElement]]:
+    """Пары (имя, элемент) для элементов с индексируемым именем в поддеревьях nodes в порядке обхода"""
+    named = []
+
+    def enter(node):
+        if not isinstance(node, BaseElement):
+            return None
+        name = node.object_name
+        # То же правило, что BaseElement._is_indexed_name
+        if name and name != node.object_type:
+            named.append((name, node))
+        return iter_items(node._get_children())
+
+    for node in nodes:
+        walk(node, enter)
+    return named
+
+
+class NameIndex(dict):
+    """
+    Индекс имён элементов страницы: {object_name: элемент}
+
+    Имя может повторяться (имя элемента служит и CSS классом): тогда
+    значение — словарь {id(элемент): элемент} в порядке добавления.
+    Страница с unique_names=True проверяет изменения до изменения дерева
+    (check_unique) и отклоняет повторяющееся имя.
+
+    Копия страницы (Page.copy) делит индекс с оригиналом и копирует его
+    при первом изменении, словари повторов копируются при первом изменении
+    каждого. Значения такого индекса могут указывать на узлы оригинала:
+    их копии находит Page.find.
+    """
+
+    __slots__ = ("page", "_shared", "_owned")
+
+    def __init__(self, items=(), page=None, shared: bool = False):
+        super().__init__(items)
+        self.page = page
+        # Словари повторов общие с индексом оригинала, кроме имён из _owned
+        self._shared = shared
+        self._owned = set()
+
+    @classmethod
+    def build(cls, page) -> "NameIndex":
+        """Индекс текущего дерева страницы"""
+        index = cls(page=page)
+        index.apply(get_named(page._get_children()))
+        return index
+
+    def get_all(self, name: str) -> List[BaseElement]:
+        """Все элементы с именем name в порядке добавления"""
+        value = self.get(name)
+        if value is None:
+            return []
+        if type(value) is dict:
+            return list(value.values())
+        return [value]
+
+    def check_unique(self, added: List[tuple], removed: List[tuple] = ()) -> None:
+        """
+        Проверить, что после удаления removed и добавления added имена не повторяются
+
+        added и removed — пары (имя, элемент), см. get_named.
+        Raises ValueError для первого повторяющегося имени.
+        """
+        removed_nodes = [node for _, node in removed]
+        seen = {}
+        for name, node in added:
+            if seen.setdefault(name, node) is not node:
+                raise ValueError(f"Элемент с именем '{name}' уже есть на странице")
+            for current in self.get_all(name):
+                if derives(node, current) or any(derives(other, current) for other in removed_nodes):
+                    continue
+                raise ValueError(f"Элемент с именем '{name}' уже есть на странице")
+
+    def apply(self, added: Iterable[tuple] = (), removed: Iterable[tuple] = ()) -> None:
+        """Удалить из индекса пары (имя, элемент) removed и добавить added"""
+        for name, node in removed:
+            self._discard(name, node)
+        for name, node in added:
+            self._add(name, node)
+
+    def _get_duplicates(self, name: str, elements: dict) -> dict:
+        """Словарь повторов имени, принадлежащий индексу, для изменения"""
+        if self._shared and name not in self._owned:
+            elements = self[name] = dict(elements)
+            self._owned.add(name)
+        return elements
+
+    def _add(self, name: str, node: BaseElement) -> None:
+        value = self.get(name)
+        if value is None or derives(node, value):
+            self[name] = node
+            return
+        if type(value) is not dict:
+            self[name] = {id(value): value, id(node): node}
+            self._owned.add(name)
+            return
+        elements = self._get_duplicates(name, value)
+        # Копия узла заменяет свой оригинал
+        origin = node
+        while origin is not None and elements.pop(id(origin), None) is None:
+            origin = origin._origin
+        elements[id(node)] = node
+
+    def _discard(self, name: str, node: BaseElement) -> None:
+        value = self.get(name)
+        if value is None:
+            return
+        if type(value) is not dict:
+            if derives(node, value):
+                del self[name]
+            return
+        elements = self._get_duplicates(name, value)
+        origin = node
+        while origin is not None and elements.pop(id(origin), None) is None:
+            origin = origin._origin
+        if len(elements) == 1:
+            self[name] = next(iter(elements.values()))
+            self._owned.discard(name)
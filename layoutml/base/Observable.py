@@ -0,0 +1,719 @@
+import copy
+from types import MappingProxyType
+from typing import Any, Callable, Iterator, List
+
+# Общие пустые значения ленивых атрибутов (см. LazyAttribute): неизменяемые,
+# чтобы случайная запись в них не затронула все элементы сразу
+EMPTY_DICT = MappingProxyType({})
+EMPTY_LIST = ()
+# Слот без начального значения
+_UNSET = object()
+
+
+class ChildAttribute:
+    """
+    Атрибут с дочерним объектом, который хранится в слоте "_" + имя атрибута
+
+    Копия страницы (Page.copy) делит дочерние узлы с оригиналом: обращение
+    к атрибуту копии отдаёт узел, принадлежащий ей (см. Observable._own).
+    Код, которому нужно только прочитать значение, берёт слот напрямую.
+    """
+
+    __slots__ = ("slot_name", "slot")
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.slot_name = "_" + name
+        self.slot = owner.__dict__[self.slot_name]
+
+    def _get_owned(self, instance, value):
+        if isinstance(value, Observable):
+            owned = instance._own(value)
+            if owned is not value:
+                self.slot.__set__(instance, owned)
+            return owned
+        return value
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return self._get_owned(instance, self.slot.__get__(instance, owner))
+
+    def __set__(self, instance, value) -> None:
+        self.slot.__set__(instance, value)
+
+
+class LazyAttribute(ChildAttribute):
+    """
+    Атрибут-контейнер, который создаётся при первом обращении
+
+    Значение хранится в слоте "_" + имя атрибута. Пока контейнер не создан,
+    в слоте лежит общее пустое значение empty, и код, которому нужно только
+    прочитать атрибут, берёт слот напрямую: пустые словари, списки и объекты
+    стилей не создаются у каждого элемента. Так же в слоте может лежать
+    кортеж значений по умолчанию. Обращение к самому атрибуту
+    создаёт контейнер (factory()) и связывает его с владельцем так же, как
+    присваивание.
+    """
+
+    __slots__ = ("factory", "empty")
+
+    def __init__(self, factory: Callable[[], Any], empty: Any = None):
+        self.factory = factory
+        self.empty = empty
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = self.slot.__get__(instance, owner)
+        if value is self.empty:
+            # Пустой контейнер не меняет разметку и стили, кэш не сбрасывается
+            value = instance._observe(self.factory())
+        elif type(value) is tuple:
+            # Значения по умолчанию, записанные при рендере (см.
+            # BaseElement._get_open_tag), становятся изменяемым контейнером
+            # с тем же содержимым, кэш так же не сбрасывается
+            value = instance._observe(self.factory(value))
+        else:
+            return self._get_owned(instance, value)
+        self.slot.__set__(instance, value)
+        return value
+
+
+class Observable:
+    """
+    Базовый класс для объектов дерева, изменения которых нужно отслеживать
+
+    Любое присваивание публичного атрибута, а также изменение списков и
+    словарей, хранящихся в атрибутах, вызывает _invalidate(): узел и все его
+    предки помечаются грязными, а их кэш рендера сбрасывается. Если изменение
+    касается стилей, так же сбрасывается кэш собранных стилей. Ссылки на предков хранятся в _parents,
+    они не копируются при deepcopy и не сериализуются pickle.
+
+    Атрибуты узлов хранятся в __slots__: у элементов нет __dict__, а слоты
+    получают начальные значения из _slot_defaults при создании объекта.
+    Подклассы без __slots__ (например, пользовательские элементы) получают
+    __dict__ и работают как обычно.
+    """
+
+    __slots__ = ("_parents",)
+
+    # Узел хранит кэш рендера (BaseElement), остальные только передают сигнал
+    _cacheable = False
+    # None — узел грязный: не отрендерен или изменён после рендера. Рендер
+    # без аргументов хранится как есть, с аргументами — в словаре по ключу
+    # аргументов (см. _store_render)
+    _html_cache = None
+    # То же для собранных стилей (см. BaseElement.collect_styles)
+    _styles_cache = None
+    _styles_dirty = True
+    # Любое изменение объекта меняет стили (CSSBase, CSSSelectors)
+    _style_source = False
+    # Атрибуты, присваивание которых меняет стили
+    _style_fields = frozenset()
+    # Атрибуты с дочерними узлами: их замену проверяет индекс имён страницы
+    _child_fields = frozenset()
+    # Начальные значения слотов: пары (имя, значение), дополняются подклассами
+    # и пустыми значениями их LazyAttribute
+    _slot_defaults = (("_parents", None),)
+    # Слоты состояния по всей иерархии: (имя, дескриптор, начальное значение)
+    _state_slots = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        defaults = {}
+        slots = []
+        for klass in reversed(cls.__mro__):
+            defaults.update(klass.__dict__.get("_slot_defaults", ()))
+            for value in klass.__dict__.values():
+                if isinstance(value, LazyAttribute):
+                    defaults[value.slot_name] = value.empty
+            for name in klass.__dict__.get("__slots__", ()):
+                if name not in ("_parents", "__dict__", "__weakref__"):
+                    slots.append((name, klass.__dict__[name]))
+        cls._slot_defaults = tuple(defaults.items())
+        cls._state_slots = tuple((name, slot, defaults.get(name, _UNSET)) for name, slot in slots)
+
+    def __new__(cls, *args, **kwargs):
+        self = object.__new__(cls)
+        for name, value in cls._slot_defaults:
+            object.__setattr__(self, name, value)
+        return self
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name[0] == "_":
+            object.__setattr__(self, name, value)
+            return
+        if name in self._child_fields:
+            self._replace_children(name, value)
+        elif name == "object_name" and self._parents:
+            self._renaming(value)
+        object.__setattr__(self, name, self._observe(value))
+        self._invalidate(name in self._style_fields)
+
+    def _observe(self, value: Any) -> Any:
+        """Обернуть список или словарь и связать дочерний объект с этим узлом"""
+        if type(value) is list:
+            return ObservedList(value, self)
+        if type(value) is dict:
+            return ObservedDict(value, self)
+        if isinstance(value, Observable):
+            value._add_parent(self)
+        return value
+
+    def _get_parents(self) -> List["Observable"]:
+        parents = self._parents
+        if parents is None:
+            parents = []
+            object.__setattr__(self, "_parents", parents)
+        return parents
+
+    def _add_parent(self, parent: "Observable") -> None:
+        parents = self._get_parents()
+        for existing in parents:
+            if existing is parent:
+                return
+        parents.append(parent)
+
+    def _remove_parent(self, parent: "Observable") -> None:
+        parents = self._get_parents()
+        for index, existing in enumerate(parents):
+            if existing is parent:
+                del parents[index]
+                return
+
+    @property
+    def _dirty(self) -> bool:
+        """Кэш рендера узла пуст: узел не отрендерен или изменён после рендера"""
+        return self._html_cache is None
+
+    def _invalidate(self, styles: bool = False) -> None:
+        """Сбросить кэш рендера, а при styles=True и кэш стилей, у узла и его предков"""
+        styles = styles or self._style_source
+        if self._cacheable and self._html_cache is None and (self._styles_dirty or not styles):
+            return
+        stack = [(self, styles)]
+        while stack:
+            node, styles = stack.pop()
+            if node._cacheable:
+                # Грязный узел означает, что грязные и все его предки
+                render = node._html_cache is not None
+                if render:
+                    object.__setattr__(node, "_html_cache", None)
+                if styles and node._styles_dirty:
+                    styles = False
+                elif styles:
+                    object.__setattr__(node, "_styles_dirty", True)
+                    object.__setattr__(node, "_styles_cache", None)
+                if not render and not styles:
+                    continue
+            parents = node._parents
+            if parents is None:
+                continue
+            if type(parents) is SharedParents:
+                SharedParents.changes += 1
+            for parent in parents:
+                stack.append((parent, styles))
+
+    def _container_changed(self) -> None:
+        # Списки и словари элемента (class_, elements, items...) считаются
+        # влияющими на стили, у CSS объектов это определяет _style_source
+        self._invalidate(self._cacheable)
+
+    def _children_changing(self, added: Any, removed: Any) -> None:
+        """
+        Дочерние узлы added будут добавлены, а removed удалены
+
+        Вызывается списком до добавления и после удаления (см. ObservedList),
+        элементы обновляют индекс имён страницы (BaseElement).
+        """
+
+    def _renaming(self, name: Any) -> None:
+        """Узел, связанный с предками, получит имя name (см. BaseElement)"""
+
+    def _get_render(self, key: Any) -> Any:
+        """Результат рендера с ключом аргументов key из кэша или None"""
+        cache = self._html_cache
+        if type(cache) is dict:
+            return cache.get(key)
+        return cache if key is None else None
+
+    def _store_render(self, key: Any, html: Any) -> None:
+        """
+        Сохранить результат рендера и пометить узел чистым
+
+        У большинства узлов есть только рендер без аргументов (key=None):
+        он хранится в кэше без словаря. Словарь появляется с первым рендером
+        с аргументами.
+        """
+        cache = self._html_cache
+        if type(cache) is dict:
+            cache[key] = html
+            return
+        if key is None:
+            cache = html
+        elif cache is None:
+            cache = {key: html}
+        else:
+            cache = {None: cache, key: html}
+        object.__setattr__(self, "_html_cache", cache)
+
+    def _store_styles(self, key: Any, rules: tuple) -> None:
+        """Сохранить собранные стили поддерева и пометить их актуальными"""
+        cache = self._styles_cache
+        if cache is None:
+            cache = {}
+            object.__setattr__(self, "_styles_cache", cache)
+        cache[key] = rules
+        object.__setattr__(self, "_styles_dirty", False)
+
+    def _own(self, child: "Observable") -> "Observable":
+        """
+        Дочерний объект, принадлежащий этому узлу
+
+        Копия страницы делит неизменённых потомков с оригиналом и не связывает
+        их с собой. Такой потомок при выдаче для изменения копируется
+        (_copy_node) и связывается с этим узлом, вызывающая сторона ставит
+        копию на место оригинала. Связанный потомок возвращается как есть.
+        """
+        parents = child._parents
+        if parents is not None:
+            for parent in parents:
+                if parent is self:
+                    return child
+        owned = child._copy_node()
+        owned._add_parent(self)
+        return owned
+
+    def _own_item(self, items: list, index: int) -> Any:
+        """Элемент items[index], принадлежащий узлу (см. _own)"""
+        item = list.__getitem__(items, index)
+        if not isinstance(item, Observable):
+            return item
+        owned = self._own(item)
+        if owned is not item:
+            list.__setitem__(items, index, owned)
+        return owned
+
+    def _copy_node(self) -> "Observable":
+        """
+        Копия узла для копии страницы (Page.copy)
+
+        Объекты стилей копируются целиком. У элементов копируются только
+        собственные списки, словари и кэши: дочерние узлы и объекты стилей
+        остаются общими с оригиналом и не связываются с копией, их копирует
+        _own при первом обращении через копию. Копия элемента хранит ссылку
+        на оригинал в _origin (см. derives).
+        """
+        if not self._cacheable:
+            return copy.deepcopy(self)
+        cls = self.__class__
+        clone = cls.__new__(cls)
+        for name, value in self._get_state().items():
+            kind = type(value)
+            if kind is ObservedList or kind is SharedList or kind is ObservedDict:
+                for item in value.values() if kind is ObservedDict else list.__iter__(value):
+                    _mark_shared(item)
+                value = value._copy_for(clone)
+            elif kind is dict:
+                value = value.copy()
+            else:
+                _mark_shared(value)
+            object.__setattr__(clone, name, value)
+        object.__setattr__(clone, "_origin", self)
+        return clone
+
+    def _get_state(self) -> dict:
+        """
+        Атрибуты объекта из слотов и __dict__ без ссылок на предков и оригинал
+
+        Слоты с начальным значением не попадают в состояние: их восстановит
+        __new__ при копировании и загрузке из pickle.
+        """
+        state = {}
+        for name, slot, default in self._state_slots:
+            try:
+                value = slot.__get__(self)
+            except AttributeError:
+                continue
+            if value is not default:
+                state[name] = value
+        instance_dict = getattr(self, "__dict__", None)
+        if instance_dict:
+            state.update(instance_dict)
+        state.pop("_parents", None)
+        state.pop("_origin", None)
+        return state
+
+    def _link_children(self) -> None:
+        """Восстановить ссылки дочерних объектов на этот узел"""
+        for value in self._get_state().values():
+            if isinstance(value, Observable):
+                value._add_parent(self)
+            elif isinstance(value, (ObservedList, ObservedDict)):
+                value._owner = self
+                value._link_all()
+
+    def __deepcopy__(self, memo):
+        cls = self.__class__
+        clone = cls.__new__(cls)
+        memo[id(self)] = clone
+        for name, value in self._get_state().items():
+            object.__setattr__(clone, name, copy.deepcopy(value, memo))
+        clone._link_children()
+        return clone
+
+    def __getstate__(self):
+        return self._get_state()
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+        self._link_children()
+
+
+def derives(node: Any, origin: Any) -> bool:
+    """node — сам origin или его копия для копии страницы (см. Observable._copy_node)"""
+    while node is not None:
+        if node is origin:
+            return True
+        node = getattr(node, "_origin", None)
+    return False
+
+
+class SharedParents(list):
+    """
+    Предки узла, который копии страниц делят с оригиналом (см. Observable._copy_node)
+
+    Копия ссылается на общий узел без связи с ним, поэтому изменение узла
+    не доходит до кэшей копии по ссылкам на предков. Вместо этого
+    _invalidate увеличивает общий счётчик changes, а копия страницы сверяет
+    его перед тем, как взять результат из кэша (см. Page._check_shared).
+    """
+
+    __slots__ = ()
+
+    # Число изменений общих узлов за время работы процесса
+    changes = 0
+
+
+def _mark_shared(value: Any) -> None:
+    if isinstance(value, Observable) and type(value._parents) is not SharedParents:
+        object.__setattr__(value, "_parents", SharedParents(value._parents or ()))
+
+
+def _link(value: Any, owner: Observable) -> None:
+    if isinstance(value, Observable) and owner is not None:
+        value._add_parent(owner)
+
+
+def _unlink(value: Any, owner: Observable) -> None:
+    if isinstance(value, Observable) and owner is not None:
+        value._remove_parent(owner)
+
+
+def _wrap_plain(value: Any, owner: Observable) -> Any:
+    # Простые словари и списки внутри контейнеров (ссылки и мета-теги Head,
+    # опции Select, скрипты Body) изменяются на месте: их изменения тоже
+    # сообщаются владельцу контейнера
+    kind = type(value)
+    if kind is dict:
+        return ObservedDict(value, owner)
+    if kind is list:
+        return ObservedList(value, owner)
+    return value
+
+
+def _copy_plain(value: Any, owner: Observable) -> Any:
+    # Вложенные словари и списки изменяются на месте, поэтому копируются
+    # вместе с контейнером
+    if isinstance(value, (ObservedList, ObservedDict)):
+        return value._copy_for(owner)
+    return value
+
+
+class ObservedList(list):
+    """Список, сообщающий владельцу об изменениях"""
+
+    __slots__ = ("_owner",)
+
+    def __init__(self, items=(), owner: Observable = None):
+        super().__init__(_wrap_plain(item, owner) for item in items)
+        self._owner = owner
+        self._link_all()
+
+    def _link_all(self) -> None:
+        for item in self:
+            _link(item, self._owner)
+
+    def _changed(self) -> None:
+        if self._owner is not None:
+            self._owner._container_changed()
+
+    def _children_changing(self, added, removed=()) -> None:
+        # Добавление сообщается до изменения списка: индекс имён страницы
+        # может отклонить повторяющееся имя, пока дерево не изменилось
+        owner = self._owner
+        if owner is None:
+            return
+        for items in (added, removed):
+            for item in items:
+                if isinstance(item, Observable):
+                    owner._children_changing(added, removed)
+                    return
+
+    def _discard(self, items) -> None:
+        for item in items:
+            if isinstance(item, Observable) and not any(existing is item for existing in list.__iter__(self)):
+                _unlink(item, self._owner)
+
+    def append(self, item) -> None:
+        item = _wrap_plain(item, self._owner)
+        self._children_changing((item,))
+        super().append(item)
+        _link(item, self._owner)
+        self._changed()
+
+    def extend(self, items) -> None:
+        items = [_wrap_plain(item, self._owner) for item in items]
+        self._children_changing(items)
+        super().extend(items)
+        for item in items:
+            _link(item, self._owner)
+        self._changed()
+
+    def insert(self, index, item) -> None:
+        item = _wrap_plain(item, self._owner)
+        self._children_changing((item,))
+        super().insert(index, item)
+        _link(item, self._owner)
+        self._changed()
+
+    def remove(self, item) -> None:
+        super().remove(item)
+        self._children_changing((), (item,))
+        self._discard([item])
+        self._changed()
+
+    def pop(self, index=-1):
+        item = super().pop(index)
+        self._children_changing((), (item,))
+        self._discard([item])
+        self._changed()
+        return item
+
+    def clear(self) -> None:
+        removed = list(self)
+        super().clear()
+        self._children_changing((), removed)
+        self._discard(removed)
+        self._changed()
+
+    def __setitem__(self, index, value) -> None:
+        removed = list.__getitem__(self, index) if isinstance(index, slice) else [list.__getitem__(self, index)]
+        added = [_wrap_plain(item, self._owner) for item in (value if isinstance(index, slice) else (value,))]
+        self._children_changing(added, removed)
+        super().__setitem__(index, added if isinstance(index, slice) else added[0])
+        for item in added:
+            _link(item, self._owner)
+        self._discard(removed)
+        self._changed()
+
+    def __delitem__(self, index) -> None:
+        removed = list.__getitem__(self, index) if isinstance(index, slice) else [list.__getitem__(self, index)]
+        super().__delitem__(index)
+        self._children_changing((), removed)
+        self._discard(removed)
+        self._changed()
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def __imul__(self, n):
+        super().__imul__(n)
+        self._changed()
+        return self
+
+    def sort(self, *args, **kwargs) -> None:
+        super().sort(*args, **kwargs)
+        self._changed()
+
+    def reverse(self) -> None:
+        super().reverse()
+        self._changed()
+
+    def __deepcopy__(self, memo):
+        clone = ObservedList.__new__(ObservedList)
+        memo[id(self)] = clone
+        list.extend(clone, (copy.deepcopy(item, memo) for item in list.__iter__(self)))
+        clone._owner = copy.deepcopy(self._owner, memo)
+        clone._link_all()
+        return clone
+
+    def __reduce__(self):
+        return (ObservedList, (list(list.__iter__(self)), self._owner))
+
+    def _copy_for(self, owner: Observable) -> "SharedList":
+        """Копия для копии узла owner: элементы общие и не связываются с ним (см. SharedList)"""
+        clone = SharedList.__new__(SharedList)
+        list.extend(clone, [_copy_plain(item, owner) for item in list.__iter__(self)])
+        clone._owner = owner
+        return clone
+
+
+def iter_items(items) -> Iterator:
+    """
+    Перебор списка дочерних узлов только для чтения
+
+    Общие с оригиналом элементы списка копии (SharedList) не копируются:
+    рендер, сбор стилей и поиск читают их на месте.
+    """
+    if type(items) is SharedList:
+        return list.__iter__(items)
+    return iter(items)
+
+
+class SharedList(ObservedList):
+    """
+    Список копии узла, элементы которого общие с оригиналом (см. ObservedList._copy_for)
+
+    Элемент, который список выдаёт (индексирование, перебор, pop, copy),
+    сначала копируется и связывается с владельцем (Observable._own_item):
+    изменения через копию страницы не затрагивают оригинал. После того как
+    выданы все элементы, список становится обычным ObservedList.
+    """
+
+    __slots__ = ()
+
+    def _own_all(self) -> None:
+        owner = self._owner
+        for index in range(len(self)):
+            owner._own_item(self, index)
+        self.__class__ = ObservedList
+
+    def __iter__(self):
+        self._own_all()
+        return list.__iter__(self)
+
+    def __reversed__(self):
+        self._own_all()
+        return list.__reversed__(self)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            self._own_all()
+        else:
+            self._owner._own_item(self, index)
+        return list.__getitem__(self, index)
+
+    def pop(self, index=-1):
+        self._owner._own_item(self, index)
+        return super().pop(index)
+
+    def copy(self) -> list:
+        self._own_all()
+        return list.copy(self)
+
+
+class ObservedDict(dict):
+    """Словарь, сообщающий владельцу об изменениях"""
+
+    __slots__ = ("_owner",)
+
+    def __init__(self, items=(), owner: Observable = None):
+        super().__init__(items)
+        for key, value in self.items():
+            if type(value) is dict or type(value) is list:
+                dict.__setitem__(self, key, _wrap_plain(value, owner))
+        self._owner = owner
+        self._link_all()
+
+    def _link_all(self) -> None:
+        for value in self.values():
+            _link(value, self._owner)
+
+    def _changed(self) -> None:
+        if self._owner is not None:
+            self._owner._container_changed()
+
+    def __setitem__(self, key, value) -> None:
+        old = self.get(key)
+        if key in self and (old is value or (isinstance(value, str) and old == value)):
+            return
+        value = _wrap_plain(value, self._owner)
+        super().__setitem__(key, value)
+        if old is not None:
+            _unlink(old, self._owner)
+        _link(value, self._owner)
+        self._changed()
+
+    def __delitem__(self, key) -> None:
+        old = self[key]
+        super().__delitem__(key)
+        _unlink(old, self._owner)
+        self._changed()
+
+    def pop(self, key, *default):
+        had_key = key in self
+        value = super().pop(key, *default)
+        if had_key:
+            _unlink(value, self._owner)
+            self._changed()
+        return value
+
+    def popitem(self):
+        key, value = super().popitem()
+        _unlink(value, self._owner)
+        self._changed()
+        return key, value
+
+    def clear(self) -> None:
+        removed = list(self.values())
+        super().clear()
+        for value in removed:
+            _unlink(value, self._owner)
+        self._changed()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs) -> None:
+        changed = {}
+        for key, value in dict(*args, **kwargs).items():
+            if key in self:
+                old = dict.__getitem__(self, key)
+                if old is value or (isinstance(value, str) and old == value):
+                    continue
+                _unlink(old, self._owner)
+            changed[key] = _wrap_plain(value, self._owner)
+        if not changed:
+            return
+        super().update(changed)
+        for value in changed.values():
+            _link(value, self._owner)
+        self._changed()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def __deepcopy__(self, memo):
+        clone = ObservedDict.__new__(ObservedDict)
+        memo[id(self)] = clone
+        for key, value in self.items():
+            dict.__setitem__(clone, copy.deepcopy(key, memo), copy.deepcopy(value, memo))
+        clone._owner = copy.deepcopy(self._owner, memo)
+        clone._link_all()
+        return clone
+
+    def __reduce__(self):
+        return (ObservedDict, (dict(self), self._owner))
+
+    def _copy_for(self, owner: Observable) -> "ObservedDict":
+        """Копия для копии узла owner: значения общие и не связываются с ним"""
+        clone = ObservedDict.__new__(ObservedDict)
+        dict.update(clone, {key: _copy_plain(value, owner) for key, value in self.items()})
+        clone._owner = owner
+        return clone
@@ -0,0 +1,59 @@
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+# enter(node) -> дочерние узлы или None, exit(node) -> None
+Enter = Callable[[Any], Optional[Iterable]]
+Exit = Callable[[Any], None]
+
+
+def walk(root: Any, enter: Enter, exit: Optional[Exit] = None) -> None:
+    """
+    Обход дерева в глубину с явным стеком
+
+    enter(node) вызывается при входе в узел и возвращает его дочерние узлы
+    (любой итерируемый объект, в том числе генератор, который читается по
+    мере обхода) или None, если потомков обходить не нужно. exit(node)
+    вызывается, когда обойдены все потомки узла, для которого enter вернул
+    дочерние узлы. Рекурсии нет: глубина дерева ограничена только памятью,
+    а на узел приходится один вызов enter вместо кадра рекурсивного метода.
+    """
+    children = enter(root)
+    if children is None:
+        return
+    stack = [(root, iter(children))]
+    while stack:
+        node, children = stack[-1]
+        for child in children:
+            grandchildren = enter(child)
+            if grandchildren is not None:
+                stack.append((child, iter(grandchildren)))
+                break
+        else:
+            stack.pop()
+            if exit is not None:
+                exit(node)
+
+
+def iter_walk(root: Any, enter: Enter, exit: Optional[Exit] = None) -> Iterator[Any]:
+    """
+    То же, что walk, по шагам: генератор отдаёт каждый узел после вызова enter
+
+    Вызывающая сторона может забирать результат enter по частям, не дожидаясь
+    конца обхода (см. BaseElement.iter_html).
+    """
+    children = enter(root)
+    yield root
+    if children is None:
+        return
+    stack = [(root, iter(children))]
+    while stack:
+        node, children = stack[-1]
+        for child in children:
+            grandchildren = enter(child)
+            yield child
+            if grandchildren is not None:
+                stack.append((child, iter(grandchildren)))
+                break
+        else:
+            stack.pop()
+            if exit is not None:
+                exit(node)
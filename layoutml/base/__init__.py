@@ -1,4 +1,6 @@
 from .HTMLElement import HTMLElement
 from .BaseElement import BaseElement
+from .NameIndex import NameIndex
+from .Traversal import walk, iter_walk
 
-__all__ = ["HTMLElement", "BaseElement"]
+__all__ = ["HTMLElement", "BaseElement", "NameIndex", "walk", "iter_walk"]
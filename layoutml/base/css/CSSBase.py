@@ -1,9 +1,29 @@
+from contextvars import ContextVar
 from typing import Dict, Any, Optional, Union, List
 
+from layoutml.base.Observable import Observable
 
-class CSSBase:
+# Минификация на время рендеринга страницы (Page.minify_css), None — общая
+# настройка CSSBase.minify
+render_minify: ContextVar = ContextVar("render_minify", default=None)
+
+
+def is_minify_enabled() -> bool:
+    """Выводить ли стили минифицированными при текущем рендеринге"""
+    minify = render_minify.get()
+    return CSSBase.minify if minify is None else minify
+
+
+class CSSBase(Observable):
     """Класс с методами для работы с CSS стилями HTML элементов"""
 
+    __slots__ = ("styles", "type")
+
+    _style_source = True
+    # Минифицированный вывод стилей во всех таблицах и атрибутах style, общий для процесса
+    # (страницы и файлы стилей приложения минифицирует LayoutML(minify_css=True))
+    minify = False
+
     styles: dict
 
     def __init__(self, type=None, style=None):
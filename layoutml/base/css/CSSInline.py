@@ -1,9 +1,15 @@
 from typing import Dict
-from .CSSBase import CSSBase
+from .CSSBase import CSSBase, is_minify_enabled
+from .CSSMinifier import minify_declarations
 
 
 class CSSInline(CSSBase):
 
+    __slots__ = ()
+
+    # Встроенные стили попадают в атрибут style, а не в таблицу стилей
+    _style_source = False
+
     styles: dict
 
     def __init__(self, style=None):
@@ -11,7 +17,9 @@ class CSSInline(CSSBase):
 
     def get_styles_str(self, space=False):
         styles = self.get_styles_string(space=space)
+        if styles and is_minify_enabled():
+            styles = minify_declarations(styles)
         if styles:
-            return f'style="{self.get_styles_string(space=space)}"'
+            return f'style="{styles}"'
         else:
             return ""
@@ -0,0 +1,127 @@
+import re
+from typing import Dict, List
+
+from .CSSOptimizer import _get_declarations
+
+_LENGTH_UNITS = "px|em|rem|ex|ch|vw|vh|vmin|vmax|cm|mm|in|pt|pc|q"
+# Ноль с единицей длины: 0px, 0.0em (проценты и время не трогаются, 0s и 0% не везде равны 0)
+_ZERO_UNIT_RE = re.compile(rf"(?<![\w.#-])-?(?:0+(?:\.0*)?|\.0+)(?:{_LENGTH_UNITS})(?![\w%])", re.IGNORECASE)
+_LEADING_ZERO_RE = re.compile(r"(?<![\w.#])0+\.(\d)")
+_HEX_COLOR_RE = re.compile(r"#([0-9a-fA-F]{6})(?![0-9a-fA-F])")
+_MATH_FUNCTION_RE = re.compile(r"\b(?:calc|min|max|clamp)\(", re.IGNORECASE)
+_SPACE_RE = re.compile(r"\s+")
+_PUNCTUATION_SPACE_RE = re.compile(r"\s*([,/])\s*|(?<=\()\s+|\s+(?=\))")
+_COMBINATOR_RE = re.compile(r"\s*([>+~,])\s*")
+
+_BOX_SIDES = ("top", "right", "bottom", "left")
+
+
+def _shorten_hex(match: re.Match) -> str:
+    value = match.group(1).lower()
+    if value[0] == value[1] and value[2] == value[3] and value[4] == value[5]:
+        return "#" + value[0::2]
+    return "#" + value
+
+
+def minify_value(value: str) -> str:
+    """
+    Сжать значение свойства
+
+    Убираются лишние пробелы, цвета #aabbcc сокращаются до #abc, у нулевых
+    длин отбрасываются единицы, у дробей ведущий ноль. Значения со строками
+    и url() только очищаются от лишних пробелов, в calc() и подобных
+    функциях единицы у нулей сохраняются.
+    """
+    value = _SPACE_RE.sub(" ", value).strip()
+    if '"' in value or "'" in value or "url(" in value:
+        return value
+    value = _PUNCTUATION_SPACE_RE.sub(lambda match: match.group(1) or "", value)
+    value = _HEX_COLOR_RE.sub(_shorten_hex, value)
+    if not _MATH_FUNCTION_RE.search(value):
+        value = _ZERO_UNIT_RE.sub("0", value)
+    return _LEADING_ZERO_RE.sub(r".\1", value)
+
+
+def _shorten_box(values: List[str]) -> str:
+    """Сократить значения top right bottom left до минимального числа"""
+    top, right, bottom, left = values
+    if right == left:
+        if top == bottom:
+            return top if top == right else f"{top} {right}"
+        return f"{top} {right} {bottom}"
+    return f"{top} {right} {bottom} {left}"
+
+
+def _expand_box(value: str) -> List[str] | None:
+    """Значения сторон из сокращённой записи margin/padding или None"""
+    parts = value.split(" ")
+    if "!" in value or not 1 <= len(parts) <= 4 or any(not part or "(" in part for part in parts):
+        return None
+    if len(parts) == 1:
+        return parts * 4
+    if len(parts) == 2:
+        return parts * 2
+    if len(parts) == 3:
+        return [parts[0], parts[1], parts[2], parts[1]]
+    return parts
+
+
+def _merge_box(declarations: List[tuple], prop: str) -> List[tuple]:
+    """
+    Заменить четыре свойства prop-top/right/bottom/left одним prop
+
+    Слияние выполняется, только если каждая сторона задана ровно один раз,
+    без !important, и других свойств prop* в блоке нет: тогда порядок
+    применения не меняется.
+    """
+    related = [index for index, (name, _) in enumerate(declarations) if name == prop or name.startswith(prop + "-")]
+    sides = {name: value for name, value in declarations if name.startswith(prop + "-")}
+    if len(related) != 4 or set(sides) != {f"{prop}-{side}" for side in _BOX_SIDES}:
+        return declarations
+    values = [sides[f"{prop}-{side}"] for side in _BOX_SIDES]
+    if any("!" in value or " " in value for value in values):
+        return declarations
+    merged = (prop, _shorten_box(values))
+    result = [declaration for index, declaration in enumerate(declarations) if index not in related]
+    result.insert(related[0], merged)
+    return result
+
+
+def minify_declarations(css: str) -> str:
+    """Блок объявлений в виде prop:value;prop:value без последней точки с запятой"""
+    declarations = []
+    for prop, value in _get_declarations(css):
+        if not prop:
+            continue
+        # Пользовательские свойства подставляются как есть, их значения не трогаем
+        if prop.startswith("--"):
+            declarations.append((prop, _SPACE_RE.sub(" ", value).strip()))
+            continue
+        prop = prop.lower()
+        value = minify_value(value)
+        if prop in ("margin", "padding"):
+            sides = _expand_box(value)
+            if sides:
+                value = _shorten_box(sides)
+        declarations.append((prop, value))
+    for prop in ("margin", "padding"):
+        declarations = _merge_box(declarations, prop)
+    return ";".join(f"{prop}:{value}" for prop, value in declarations)
+
+
+def minify_selector(selector: str) -> str:
+    """Убрать лишние пробелы в селекторе, в том числе вокруг > + ~ и запятых"""
+    selector = _SPACE_RE.sub(" ", selector).strip()
+    if selector.startswith("@"):
+        return selector
+    return _COMBINATOR_RE.sub(r"\1", selector)
+
+
+def minify_css_rules(styles: Dict[str, str]) -> str:
+    """Минифицированный текст таблицы стилей из словаря {селектор: стили}"""
+    rules = []
+    for selector, css in styles.items():
+        declarations = minify_declarations(css)
+        if declarations:
+            rules.append(f"{minify_selector(selector)}{{{declarations}}}")
+    return "".join(rules)
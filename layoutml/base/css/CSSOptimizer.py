@@ -0,0 +1,93 @@
+import hashlib
+from typing import Dict, List
+
+
+def _split_declarations(css: str) -> List[str]:
+    """
+    Разделить блок объявлений по ";"
+
+    Точка с запятой внутри строк в кавычках и скобок (url(data:...;base64,...),
+    content:"a;b") объявления не разделяет.
+    """
+    if '"' not in css and "'" not in css and "(" not in css:
+        return css.split(";")
+    items = []
+    start = depth = 0
+    quote = None
+    escaped = False
+    for index, char in enumerate(css):
+        if quote:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == quote:
+                quote = None
+        elif char == '"' or char == "'":
+            quote = char
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth = max(depth - 1, 0)
+        elif char == ";" and not depth:
+            items.append(css[start:index])
+            start = index + 1
+    items.append(css[start:])
+    return items
+
+
+def _get_declarations(css: str) -> List[tuple]:
+    """Пары (свойство, значение) из текста блока объявлений"""
+    declarations = []
+    for item in _split_declarations(css):
+        if ":" not in item:
+            continue
+        prop, value = item.split(":", 1)
+        declarations.append((prop.strip(), value.strip()))
+    return declarations
+
+
+def atomic_class_name(css: str, prefix: str = "a-") -> str:
+    """
+    Имя класса, зависящее только от содержимого блока объявлений
+
+    Одинаковые наборы стилей у разных элементов получают один класс,
+    пробелы и переносы строк на имя не влияют.
+    """
+    canonical = ";".join(f"{prop}:{value}" for prop, value in _get_declarations(css))
+    return prefix + hashlib.blake2b(canonical.encode(), digest_size=4).hexdigest()
+
+
+def group_css_rules(styles: Dict[str, str]) -> Dict[str, str]:
+    """
+    Объединить селекторы с одинаковыми блоками объявлений: ".a, .b {...}"
+
+    Правило присоединяется к более раннему правилу с тем же блоком, только
+    если между ними нет правил, задающих те же свойства: иначе перенос
+    изменил бы порядок каскада. @-правила не объединяются и служат границей.
+    """
+    groups: List[list] = []
+    by_block: Dict[tuple, int] = {}
+    # свойство -> индекс последней группы, которая его задаёт
+    last_position: Dict[str, int] = {}
+
+    for selector, css in styles.items():
+        if selector.startswith("@"):
+            groups.append([[selector], css])
+            by_block.clear()
+            continue
+
+        declarations = _get_declarations(css)
+        key = tuple(declarations)
+        index = by_block.get(key)
+        if index is not None and all(last_position.get(prop, -1) <= index for prop, _ in declarations):
+            groups[index][0].append(selector)
+            continue
+
+        index = len(groups)
+        groups.append([[selector], css])
+        by_block[key] = index
+        for prop, _ in declarations:
+            last_position[prop] = index
+
+    return {", ".join(selectors): css for selectors, css in groups}
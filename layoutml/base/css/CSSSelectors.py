@@ -1,7 +1,25 @@
-from .CSSBase import CSSBase
+from layoutml.base.Observable import Observable
+from .CSSBase import CSSBase, is_minify_enabled
+from .CSSMinifier import minify_css_rules
 
 
-class CSSSelectors:
+def format_css_rules(styles: dict, minify: bool | None = None) -> str:
+    """
+    Текст таблицы стилей из словаря {селектор: стили}
+
+    При minify=None вид вывода определяет настройка рендеринга страницы
+    или CSSBase.minify (см. is_minify_enabled).
+    """
+    if is_minify_enabled() if minify is None else minify:
+        return minify_css_rules(styles)
+    return "".join(f"{selector_name} " + "{\n" + css + "}\n" for selector_name, css in styles.items())
+
+
+class CSSSelectors(Observable):
+
+    __slots__ = ("inline", "selectors")
+
+    _style_source = True
     selectors: dict[CSSBase]
 
     def __init__(self, inline: bool = False):
@@ -13,6 +31,9 @@ class CSSSelectors:
         return str(self.selectors)
 
     def __getattr__(self, name) -> CSSBase:
+        # Служебные имена (__deepcopy__, _parents и т.п.) не должны становиться селекторами
+        if name.startswith("_"):
+            raise AttributeError(name)
         if name not in self.selectors:
             self.selectors[name] = CSSBase()
         return self.selectors[name]
@@ -46,8 +67,7 @@ class CSSSelectors:
     def add_styles(self, selector_name: str, styles: dict | CSSBase):
         """Добавляет стили к селектору"""
         if selector_name in self.selectors:
-            for prop, value in styles.items():
-                self.selectors[selector_name].styles[prop] = value
+            self.selectors[selector_name].styles.update(styles.items())
 
     def get_styles(self, space=True):
         """Генерирует словарь стилей"""
@@ -69,10 +89,7 @@ class CSSSelectors:
         return selectors_styles
 
     def get_styles_str(self):
-        styles = self.get_styles()
-        styles_str: str = ""
-        for selector_name, css in styles.items():
-            styles_str += f"{selector_name} " + "{\n" + css + "}\n"
+        styles_str = format_css_rules(self.get_styles())
 
         if self.inline:
             return f"<style>\n{styles_str}</style>"
@@ -1,5 +1,18 @@
-from .CSSBase import CSSBase
-from .CSSSelectors import CSSSelectors
+from .CSSBase import CSSBase, render_minify, is_minify_enabled
+from .CSSSelectors import CSSSelectors, format_css_rules
 from .CSSInline import CSSInline
+from .CSSOptimizer import group_css_rules, atomic_class_name
+from .CSSMinifier import minify_css_rules, minify_declarations
 
-__all__ = ["CSSBase" "CSSSelectors" "CSSInline"]
+__all__ = [
+    "CSSBase",
+    "render_minify",
+    "is_minify_enabled",
+    "CSSSelectors",
+    "CSSInline",
+    "format_css_rules",
+    "group_css_rules",
+    "atomic_class_name",
+    "minify_css_rules",
+    "minify_declarations",
+]
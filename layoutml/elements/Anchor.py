@@ -6,6 +6,8 @@ class Anchor(BaseElement):
     Элемент ссылки <a>
     """
 
+    __slots__ = ("href", "text", "target")
+
     def __init__(self, href, text="", target="_self", object_name=None, style=None, boolean_attributes=[], **kwargs):
         super().__init__(
             tag="a",
@@ -29,4 +31,4 @@ class Anchor(BaseElement):
         return " ".join(attrs) + " " + attrs_str
 
     def get_html(self, tab: int = 0):
-        return super().get_html(content=self.text, tab=tab)
+        return self._get_tag_html(self.text, tab)
@@ -6,6 +6,8 @@ class Article(BaseElement):
     Семантический элемент статьи <article>
     """
 
+    __slots__ = ()
+
     def __init__(self, object_name=None, style=None, boolean_attributes=[], **kwargs):
         super().__init__(
             tag="article",
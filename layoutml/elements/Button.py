@@ -6,6 +6,8 @@ class Button(BaseElement):
     Элемент кнопки <button>
     """
 
+    __slots__ = ("text",)
+
     def __init__(self, text="", object_name=None, style=None, boolean_attributes=[], **kwargs):
         super().__init__(
             tag="button",
@@ -19,4 +21,4 @@ class Button(BaseElement):
         self.text = text
 
     def get_html(self, tab: int = 0):
-        return super().get_html(content=self.text, tab=tab)
+        return self._get_tag_html(self.text, tab)
@@ -6,6 +6,8 @@ class Footer(BaseElement):
     Семантический элемент подвала <footer>
     """
 
+    __slots__ = ()
+
     def __init__(self, object_name=None, style=None, boolean_attributes=[], **kwargs):
         super().__init__(
             tag="footer",
@@ -3,6 +3,8 @@ from layoutml.base import BaseElement
 
 class Form(BaseElement):
 
+    __slots__ = ("form_type",)
+
     def __init__(self, form_type: str = "text", object_name=None, style=None, boolean_attributes=[], **kwargs):
         """ """
 
@@ -6,6 +6,8 @@ class Header(BaseElement):
     Семантический элемент шапки <header>
     """
 
+    __slots__ = ()
+
     def __init__(self, object_name=None, style=None, boolean_attributes=[], **kwargs):
         super().__init__(
             tag="header",
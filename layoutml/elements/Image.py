@@ -6,6 +6,8 @@ class Image(BaseElement):
     Элемент изображения <img>
     """
 
+    __slots__ = ("src", "alt")
+
     def __init__(self, src, alt="", object_name=None, style=None, boolean_attributes=[], **kwargs):
         super().__init__(
             tag="img",
@@ -6,6 +6,8 @@ class Input(Form):
     Специализированный Input элемент с удобными методами
     """
 
+    __slots__ = ("placeholder", "value", "name", "id")
+
     def __init__(
         self,
         input_type="text",
@@ -6,6 +6,8 @@ class Label(BaseElement):
     Элемент метки <label>
     """
 
+    __slots__ = ("text", "for_id")
+
     def __init__(self, for_id=None, text="", object_name=None, style=None, boolean_attributes=[], **kwargs):
         super().__init__(
             tag="label",
@@ -30,4 +32,4 @@ class Label(BaseElement):
     def get_html(self, content: str = "", tab: int = 0):
         if not content and self.text:
             content = self.text
-        return super().get_html(content=content, tab=tab)
+        return self._get_tag_html(content, tab)
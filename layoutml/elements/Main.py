@@ -6,6 +6,8 @@ class Main(BaseElement):
     Семантический элемент основного содержимого <main>
     """
 
+    __slots__ = ()
+
     def __init__(self, object_name=None, style=None, boolean_attributes=[], **kwargs):
         super().__init__(
             tag="main",
@@ -6,6 +6,8 @@ class Nav(BaseElement):
     Семантический элемент навигации <nav>
     """
 
+    __slots__ = ()
+
     def __init__(self, object_name=None, style=None, boolean_attributes=[], **kwargs):
         super().__init__(
             tag="nav",
@@ -6,6 +6,8 @@ class Select(BaseElement):
     Элемент выпадающего списка <select>
     """
 
+    __slots__ = ("options", "selected_value", "name", "id")
+
     def __init__(
         self,
         options=None,
@@ -48,14 +50,21 @@ class Select(BaseElement):
         return " ".join(attrs) + " " + attrs_str
 
     def get_html(self, content: str = "", tab: int = 0):
+        if content and not self.options:
+            return self._get_tag_html(content, tab)
+        return self._render_str(tab)
+
+    def _iter_fragments(self, tab: int = 0):
+        if not self.options:
+            yield self._get_tag_html("", tab)
+            return
+
         # Формируем опции
-        options_html = ""
+        yield self._get_open_tag()
+        yield "\n"
         for option in self.options:
             selected = ""
             if option.get("selected") or option.get("value") == self.selected_value:
                 selected = " selected"
-            options_html += f"{'    '*(tab+1)}<option value=\"{option['value']}\"{selected}>{option['text']}</option>\n"
-
-        if options_html:
-            content = f"\n{options_html}{'    '*tab}"
-        return super().get_html(content=content, tab=tab)
+            yield f"{'    '*(tab+1)}<option value=\"{option['value']}\"{selected}>{option['text']}</option>\n"
+        yield f"{'    '*tab}\n{'    '*tab}</{self.tag}>"
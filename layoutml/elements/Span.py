@@ -6,6 +6,8 @@ class Span(BaseElement):
     Строчный контейнер <span>
     """
 
+    __slots__ = ("text",)
+
     def __init__(self, text="", object_name=None, style=None, boolean_attributes=[], **kwargs):
         super().__init__(
             tag="span",
@@ -21,4 +23,4 @@ class Span(BaseElement):
     def get_html(self, content: str = "", tab: int = 0):
         if not content and self.text:
             content = self.text
-        return super().get_html(content=content, tab=tab)
+        return self._get_tag_html(content, tab)
@@ -6,6 +6,8 @@ class Textarea(BaseElement):
     Элемент многострочного текстового поля <textarea>
     """
 
+    __slots__ = ("placeholder", "value", "rows", "cols", "name", "id")
+
     def __init__(
         self,
         placeholder="",
@@ -55,4 +57,4 @@ class Textarea(BaseElement):
         # Для textarea содержимое - это значение между тегами
         if not content and self.value:
             content = self.value
-        return super().get_html(content=content, tab=tab)
+        return self._get_tag_html(content, tab)
@@ -1,4 +1,5 @@
 from layoutml.base import BaseElement
+from layoutml.base.Observable import iter_items
 
 
 class ListElement(BaseElement):
@@ -6,6 +7,10 @@ class ListElement(BaseElement):
     Базовый класс для списков
     """
 
+    __slots__ = ("items",)
+
+    _indent_children = True
+
     def __init__(self, tag, items=None, object_name=None, style=None, boolean_attributes=[], **kwargs):
         super().__init__(
             tag=tag,
@@ -24,14 +29,25 @@ class ListElement(BaseElement):
         self.items.append(item)
 
     def get_html(self, content: str = "", tab: int = 0):
+        if content and not self.items:
+            return self._get_tag_html(content, tab)
+        return self._render_str(tab)
+
+    def _get_children(self):
+        return self.items
+
+    def _iter_fragments(self, tab: int = 0):
+        if not self.items:
+            yield self._get_tag_html("", tab)
+            return
+
         # Формируем элементы списка
-        list_items = ""
-        for item in self.items:
+        yield self._get_open_tag()
+        yield "\n"
+        for item in iter_items(self.items):
             if isinstance(item, str):
-                list_items += f"{'    '*(tab+1)}<li>{item}</li>\n"
+                yield f"{'    '*(tab+1)}<li>{item}</li>\n"
             else:
-                list_items += item.get_html(tab=tab + 1) + "\n"
-
-        if list_items:
-            content = f"\n{list_items}{'    '*tab}"
-        return super().get_html(content=content, tab=tab)
+                yield item
+                yield "\n"
+        yield f"{'    '*tab}\n{'    '*tab}</{self.tag}>"
@@ -6,6 +6,8 @@ class OrderedList(ListElement):
     Нумерованный список <ol>
     """
 
+    __slots__ = ()
+
     def __init__(self, items=None, object_name=None, style=None, boolean_attributes=[], **kwargs):
         super().__init__(
             tag="ol",
@@ -6,6 +6,8 @@ class UnorderedList(ListElement):
     Ненумерованный список <ul>
     """
 
+    __slots__ = ()
+
     def __init__(self, items=None, object_name=None, style=None, boolean_attributes=[], **kwargs):
         super().__init__(
             tag="ul",
@@ -0,0 +1,110 @@
+import os
+import json
+import inspect
+import hashlib
+import logging
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from layoutml.server.Precompress import atomic_write
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CACHE_NAME = ".layoutml-export-cache.json"
+EXPORT_CACHE_VERSION = 1
+
+
+def get_source_hash(func: Callable) -> str:
+    """
+    Хэш исходного кода обработчика и модуля, в котором он объявлен
+
+    Модуль учитывается целиком: страницы и данные, которые обработчик
+    использует, обычно объявлены рядом с ним. Если исходный код недоступен,
+    используется байт-код функции.
+    """
+    func = inspect.unwrap(func)
+    digest = hashlib.sha256()
+    try:
+        digest.update(inspect.getsource(func).encode("utf-8"))
+        module_file = inspect.getsourcefile(func)
+        if module_file:
+            with open(module_file, "rb") as f:
+                digest.update(f.read())
+    except (OSError, TypeError):
+        code = getattr(func, "__code__", None)
+        digest.update(code.co_code if code is not None else repr(func).encode("utf-8"))
+        digest.update(repr(code.co_consts if code is not None else ()).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ExportCache:
+    """
+    Кэш инкрементального экспорта: {файл: запись} из прошлого запуска
+
+    Запись хранит ключ входных данных страницы (исходный код обработчика,
+    URL и параметры, _version, стили приложения), хэш записанного HTML и
+    файлы стилей страницы. HTML с тем же хэшем не перезаписывается, а
+    страница с _version и тем же ключом не рендерится заново.
+    """
+
+    def __init__(self, outdir: str, name: str = EXPORT_CACHE_NAME):
+        self.path = os.path.join(outdir, name)
+        self.outdir = outdir
+        self.pages: Dict[str, Dict[str, Any]] = {}
+        self.stylesheets: set = set()
+        self._source_hashes: Dict[int, str] = {}
+
+    def load(self) -> "ExportCache":
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return self
+        except (OSError, ValueError) as error:
+            logger.warning("Кэш экспорта %s не прочитан: %s", self.path, error)
+            return self
+        if data.get("version") == EXPORT_CACHE_VERSION:
+            self.pages = data.get("pages", {})
+            self.stylesheets = set(data.get("stylesheets", ()))
+        return self
+
+    def save(self, pages: Dict[str, Dict[str, Any]], stylesheets: Iterable[str]) -> None:
+        data = {"version": EXPORT_CACHE_VERSION, "pages": pages, "stylesheets": sorted(stylesheets)}
+        atomic_write(self.path, json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8"))
+
+    def get_key(self, func: Callable, route_path: str, url_path: str, query: Dict[str, Any], version: Any, css_hash: str) -> str:
+        """Ключ входных данных страницы"""
+        source_hash = self._source_hashes.get(id(func))
+        if source_hash is None:
+            source_hash = self._source_hashes[id(func)] = get_source_hash(func)
+        payload = json.dumps([source_hash, route_path, url_path, sorted(query.items()), version, css_hash], default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_fresh(self, file_name: str, key: str) -> Optional[Dict[str, Any]]:
+        """Запись прошлого запуска, если ключ совпал и файл на месте"""
+        entry = self.pages.get(file_name)
+        if entry is None or entry.get("key") != key:
+            return None
+        if not os.path.exists(os.path.join(self.outdir, file_name)):
+            return None
+        return entry
+
+    def remove_orphans(self, files: Iterable[str], stylesheets: Iterable[str]) -> list:
+        """Удалить файлы прошлого экспорта, которых нет в текущем"""
+        removed = []
+        orphans = (set(self.pages) - set(files)) | (self.stylesheets - set(stylesheets))
+        for file_name in sorted(orphans):
+            path = os.path.join(self.outdir, file_name)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            removed.append(file_name)
+            # Пустые каталоги, оставшиеся после удаления страниц
+            directory = os.path.dirname(path)
+            while directory and os.path.abspath(directory) != os.path.abspath(self.outdir):
+                try:
+                    os.rmdir(directory)
+                except OSError:
+                    break
+                directory = os.path.dirname(directory)
+        return removed
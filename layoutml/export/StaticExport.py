@@ -0,0 +1,335 @@
+import os
+import json
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from starlette.requests import Request
+from starlette.responses import Response, HTMLResponse
+
+from layoutml.Page import Page
+from layoutml.router.RouteTrie import PARAM_REGEX
+from layoutml.server.Precompress import atomic_write
+from .ExportCache import ExportCache, EXPORT_CACHE_NAME
+
+logger = logging.getLogger(__name__)
+
+EXPORT_MANIFEST_NAME = "export-manifest.json"
+EXPORT_MANIFEST_VERSION = 1
+
+# Приложение и каталог экспорта в воркерах: процессы создаются через fork
+# и получают их готовыми, обработчики маршрутов не нужно сериализовать
+_worker_app = None
+_worker_outdir = None
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_output_path(url_path: str) -> str:
+    """
+    Относительный путь HTML файла для URL
+
+    "/" -> index.html, "/docs/" -> docs/index.html, "/about" -> about.html:
+    страница лежит в том же каталоге, что и под сервером. Ссылки на стили
+    указываются от корня сайта (см. LayoutML._get_stylesheet_href).
+    """
+    path = url_path.lstrip("/")
+    segments = path.split("/")
+    if any(segment in (".", "..") for segment in segments):
+        raise ValueError(f"Недопустимый путь для экспорта: '{url_path}'")
+    if not path or path.endswith("/"):
+        return path + "index.html"
+    if os.path.splitext(segments[-1])[1]:
+        return path
+    return path + ".html"
+
+
+def build_url(route_path: str, values: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """
+    Подставить значения в параметры пути маршрута
+
+    Возвращает URL и оставшиеся значения, которые передаются как query.
+    """
+    query = dict(values)
+    segments = []
+    for segment in route_path.split("/"):
+        match = PARAM_REGEX.match(segment)
+        if match is None:
+            segments.append(segment)
+            continue
+        name = match.group("name")
+        if name not in query:
+            raise KeyError(f"Нет значения для параметра пути '{name}' маршрута '{route_path}'")
+        value = str(query.pop(name))
+        if "/" in value and match.group("convertor") != "path":
+            raise ValueError(f"Значение параметра '{name}' маршрута '{route_path}' содержит '/': '{value}'")
+        segments.append(value)
+    return "/".join(segments), query
+
+
+def _make_request(url_path: str, query: Dict[str, Any]) -> Request:
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "http_version": "1.1",
+        "scheme": "http",
+        "path": url_path,
+        "raw_path": url_path.encode("utf-8"),
+        "query_string": urlencode(query, doseq=True).encode("utf-8"),
+        "headers": [],
+        "server": ("localhost", 80),
+        "client": None,
+    }
+    return Request(scope)
+
+
+def attach_page_css(app, page: Page, outdir: str) -> List[str]:
+    """
+    Записать стили страницы, созданной обработчиком, и подключить их
+
+    Страницы, подключённые к приложению, уже получили стили при генерации
+    CSS. Для остальных пишется файл <page>.<hash>.css: страницы с одинаковыми
+    стилями (один шаблон) используют один файл.
+    """
+    if id(page) in app._css_pages or not page.render_css_file:
+        return []
+    css_text = app.get_page_css(page)
+    if not css_text:
+        return []
+    css_file_name = app._get_hashed_css_name(page.get_object_name(), css_text)
+    path = os.path.join(outdir, css_file_name)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        atomic_write(path, css_text.encode("utf-8"))
+    if not any(link.get("href") == app._get_stylesheet_href(css_file_name) for link in page.head.links):
+        app._attach_stylesheets(page, app._get_css_entry(page, [css_file_name]))
+    return [css_file_name]
+
+
+async def render_route(app, url_path: str, query: Dict[str, Any], outdir: Optional[str] = None) -> Tuple[bytes, List[str]]:
+    """
+    Вызвать обработчик маршрута так же, как при запросе
+
+    Возвращает HTML и файлы стилей, записанные для страницы (если указан outdir).
+    """
+    route_match = app.router.match(url_path)
+    if route_match is None:
+        raise LookupError(f"Маршрут не найден: {url_path}")
+    request = _make_request(url_path, query)
+    response = HTMLResponse(status_code=200, headers={"content-type": "text/html; charset=utf-8"})
+    answer = await app.router.dispatch(request, response, route_match)
+    if isinstance(answer, Page):
+        app._prepare_page(answer)
+        css_files = attach_page_css(app, answer, outdir) if outdir is not None else []
+        return answer.get_html_bytes(), css_files
+    if isinstance(answer, str):
+        return answer.encode("utf-8"), []
+    if isinstance(answer, bytes):
+        return answer, []
+    if isinstance(answer, Response):
+        if answer.status_code != 200:
+            raise ValueError(f"Обработчик вернул статус {answer.status_code}")
+        return bytes(answer.body), []
+    raise TypeError(f"Обработчик вернул {type(answer).__name__}, ожидается Page, str или bytes")
+
+
+def _export_job(job: Tuple) -> Dict[str, Any]:
+    """
+    Отрендерить и записать одну страницу (выполняется в воркере)
+
+    HTML, совпадающий с записанным в прошлый раз (previous_sha256),
+    не перезаписывается: у файла остаётся прежнее время изменения.
+    """
+    global _worker_loop
+    route_path, url_path, query, file_name, key, previous_sha256 = job
+    result = {"route": route_path, "url": url_path, "file": file_name, "key": key}
+    if _worker_loop is None:
+        _worker_loop = asyncio.new_event_loop()
+    try:
+        html, css_files = _worker_loop.run_until_complete(render_route(_worker_app, url_path, query, _worker_outdir))
+        sha256 = hashlib.sha256(html).hexdigest()
+        path = os.path.join(_worker_outdir, file_name)
+        written = sha256 != previous_sha256 or not os.path.exists(path)
+        if written:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            atomic_write(path, html)
+    except Exception as error:
+        result["error"] = f"{type(error).__name__}: {error}"
+        return result
+    result["sha256"] = sha256
+    result["size"] = len(html)
+    result["stylesheets"] = css_files
+    result["written"] = written
+    return result
+
+
+class StaticExport:
+    """
+    Экспорт приложения в статический сайт
+
+    Перебирает маршруты, обработчики которых не имеют обязательных
+    параметров, и маршруты с генератором параметров, рендерит страницы
+    в пуле процессов и атомарно записывает HTML и CSS в outdir вместе
+    с манифестом.
+
+    При incremental=True каждая страница рендерится, но HTML с тем же
+    хэшем, что в прошлом запуске, не перезаписывается, а файлы, которых
+    больше нет в экспорте, удаляются. Страница со значением _version в
+    словаре параметров не рендерится, если её входные данные (_version,
+    исходный код обработчика и его модуля, URL, параметры, стили приложения)
+    совпали с кэшем: данные из других модулей и файлов ключ не учитывает,
+    их изменение должно менять _version.
+    """
+
+    def __init__(
+        self,
+        app,
+        outdir: str,
+        workers: int = 1,
+        params: Optional[Dict[str, Iterable[Dict[str, Any]] | Callable[[], Iterable[Dict[str, Any]]]]] = None,
+        manifest_name: str = EXPORT_MANIFEST_NAME,
+        incremental: bool = True,
+        cache_name: str = EXPORT_CACHE_NAME,
+    ):
+        self.app = app
+        self.outdir = outdir
+        self.workers = max(1, workers)
+        self.params = params or {}
+        self.manifest_name = manifest_name
+        self.incremental = incremental
+        self.cache_name = cache_name
+        self.skipped: Dict[str, str] = {}
+
+    @staticmethod
+    def _has_required_values(route_info: Dict) -> bool:
+        for info in route_info["parameters"].values():
+            if info["is_required"] and info["annotation"] not in (Request, Response):
+                return True
+        return False
+
+    def get_jobs(self) -> List[Tuple[str, str, Dict[str, Any], Any]]:
+        """
+        Задания (маршрут, URL, query, версия) для всех экспортируемых страниц
+
+        Значение _version из словаря параметров не передаётся обработчику,
+        а только учитывается в ключе кэша (например, хэш или время изменения
+        исходных данных страницы).
+        """
+        self.skipped = {}
+        jobs = []
+        seen = set()
+        for route_path, route_info in self.app.router.routes.items():
+            generator = self.params.get(route_path)
+            if generator is None:
+                if route_info["path_params"] or self._has_required_values(route_info):
+                    self.skipped[route_path] = "обязательные параметры без генератора"
+                    continue
+                values_list: Iterable[Dict[str, Any]] = [{}]
+            else:
+                values_list = generator() if callable(generator) else generator
+            for values in values_list:
+                values = dict(values)
+                version = values.pop("_version", None)
+                url_path, query = build_url(route_path, values)
+                key = (url_path, tuple(sorted(query.items())))
+                if key in seen:
+                    continue
+                seen.add(key)
+                jobs.append((route_path, url_path, query, version))
+        return jobs
+
+    def _prepare_css(self) -> Dict:
+        app = self.app
+        files, css_manifest = app.get_css_manifest()
+        app._write_css_files(files, css_manifest, self.outdir)
+        if not app._css_generated:
+            app.apply_css_manifest(css_manifest)
+        return css_manifest
+
+    def _render(self, jobs: List[Tuple[str, str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        global _worker_app, _worker_outdir
+        _worker_app, _worker_outdir = self.app, self.outdir
+        try:
+            if self.workers == 1 or len(jobs) < 2:
+                return [_export_job(job) for job in jobs]
+            if "fork" not in multiprocessing.get_all_start_methods():
+                logger.warning("Экспорт в несколько процессов требует fork, страницы рендерятся в одном процессе")
+                return [_export_job(job) for job in jobs]
+            chunksize = max(1, len(jobs) // (self.workers * 8))
+            with ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("fork")) as executor:
+                return list(executor.map(_export_job, jobs, chunksize=chunksize))
+        finally:
+            _worker_app = _worker_outdir = None
+
+    def run(self) -> Dict[str, Any]:
+        """Выполнить экспорт и вернуть манифест"""
+        os.makedirs(self.outdir, exist_ok=True)
+        cache = ExportCache(self.outdir, self.cache_name)
+        if self.incremental:
+            cache.load()
+        css_manifest = self._prepare_css()
+        css_hash = hashlib.sha256(json.dumps(css_manifest, sort_keys=True).encode("utf-8")).hexdigest()
+
+        pages: Dict[str, Dict[str, Any]] = {}
+        jobs = []
+        for route_path, url_path, query, version in self.get_jobs():
+            file_name = get_output_path(url_path)
+            func = self.app.router.routes[route_path]["func"]
+            key = cache.get_key(func, route_path, url_path, query, version, css_hash)
+            # Без рендеринга пропускаются только страницы с явным _version
+            entry = cache.get_fresh(file_name, key) if self.incremental and version is not None else None
+            if entry is not None:
+                pages[file_name] = entry
+                continue
+            previous_sha256 = cache.pages.get(file_name, {}).get("sha256")
+            jobs.append((route_path, url_path, query, file_name, key, previous_sha256))
+        cached = len(pages)
+        results = self._render(jobs)
+
+        errors = {}
+        written = 0
+        for result in results:
+            file_name = result["file"]
+            if "error" in result:
+                errors[result["url"]] = result["error"]
+                logger.error("Экспорт %s: %s", result["url"], result["error"])
+                # Прошлый вариант страницы остаётся, но будет отрендерен заново
+                if file_name in cache.pages:
+                    pages[file_name] = {**cache.pages[file_name], "key": None}
+                continue
+            written += result["written"]
+            pages[file_name] = {
+                "url": result["url"],
+                "route": result["route"],
+                "key": result["key"],
+                "sha256": result["sha256"],
+                "size": result["size"],
+            }
+            if result["stylesheets"]:
+                pages[file_name]["stylesheets"] = result["stylesheets"]
+
+        stylesheets = {name for entry in css_manifest["pages"].values() for name in entry["stylesheets"]}
+        for entry in pages.values():
+            stylesheets.update(entry.get("stylesheets", ()))
+        removed = cache.remove_orphans(pages, stylesheets) if self.incremental else []
+        cache.save(pages, stylesheets)
+
+        manifest = {
+            "version": EXPORT_MANIFEST_VERSION,
+            "pages": {
+                file_name: {name: value for name, value in entry.items() if name != "key"}
+                for file_name, entry in pages.items()
+            },
+            "css": css_manifest,
+            "skipped": self.skipped,
+            "errors": errors,
+            "stats": {"rendered": len(jobs), "cached": cached, "written": written, "removed": removed},
+        }
+        atomic_write(
+            os.path.join(self.outdir, self.manifest_name),
+            json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8"),
+        )
+        return manifest
@@ -0,0 +1,12 @@
+from .ExportCache import ExportCache, get_source_hash
+from .StaticExport import StaticExport, get_output_path, build_url, render_route, attach_page_css
+
+__all__ = [
+    "ExportCache",
+    "get_source_hash",
+    "StaticExport",
+    "get_output_path",
+    "build_url",
+    "render_route",
+    "attach_page_css",
+]
@@ -4,6 +4,8 @@ from layoutml.layout import Layout
 class HorizontalLayout(Layout):
     """Горизонтальный layout (flex-direction: row)"""
 
+    __slots__ = ()
+
     def __init__(
         self,
         justify_content="center",
@@ -1,10 +1,13 @@
 from typing import Any, List
 from layoutml.base import BaseElement
+from layoutml.base.Observable import iter_items
 
 
 class Layout(BaseElement):
     """Базовый класс для всех layout'ов"""
 
+    __slots__ = ("elements", "is_stretched")
+
     elements: List[BaseElement]
 
     def __init__(
@@ -89,20 +92,25 @@ class Layout(BaseElement):
         return self
 
     def get_html(self) -> str:
-        elements_html = ""
-        for element in self.elements:
-            if hasattr(element, "get_html"):
-                elements_html += f"\n\t\t{element.get_html()}"
-            else:
-                elements_html += f"\n\t\t{element}"
-        return super().get_html(content=elements_html, tab=2)
-
-    def get_styles(self) -> str:
-
-        css_styles: dict = super().get_styles()
-        for element in self.elements:
-            css_styles.update(element.get_styles())
-        return css_styles
+        return self._render_str()
+
+    def _iter_fragments(self, tab: int = 0):
+        # Разделитель склеивается с открывающим тегом, а перевод строки
+        # с закрывающим: на элемент приходится два фрагмента
+        open_tag = self._get_open_tag()
+        close_tag = f"{'    '*2}</{self.tag}>"
+        if not self.elements:
+            yield open_tag + close_tag
+            return
+        separator = open_tag + "\n\t\t"
+        for element in iter_items(self.elements):
+            yield separator
+            yield element if hasattr(element, "render_into") else str(element)
+            separator = "\n\t\t"
+        yield "\n" + close_tag
+
+    def _get_children(self):
+        return self.elements
 
     def __len__(self) -> int:
         """Количество элементов"""
@@ -121,14 +129,28 @@ class Layout(BaseElement):
         del self.elements[index]
 
     def get_element(self, object_name: str) -> Any:
-        for element in self.elements:
+        """
+        Элемент с именем object_name на любом уровне вложенности
+
+        Layout, входящий в страницу, ищет по индексу имён страницы
+        (см. Page.find), остальные и имена типов ищутся среди своих элементов.
+        """
+        element = self._find_descendant(object_name)[1]
+        if element is not None:
+            return element
+        for index, element in enumerate(iter_items(self.elements)):
             if element.get_object_name() == object_name:
-                return element
+                return self._own_item(self.elements, index)
         raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{object_name}'")
 
     def remove_element_by_name(self, object_name: str) -> None:
-        for index in range(len(self.elements)):
-            if self.elements[index].get_object_name() == object_name:
+        """Удалить элемент с именем object_name из его контейнера, поиск как в get_element"""
+        parent, element = self._find_descendant(object_name)
+        if element is not None and isinstance(parent._get_children(), list):
+            parent._get_children().remove(element)
+            return element
+        for index, element in enumerate(iter_items(self.elements)):
+            if element.get_object_name() == object_name:
                 return self.elements.pop(index)
 
     def remove_element_(self, index: int) -> "Layout":
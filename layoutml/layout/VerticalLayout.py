@@ -4,6 +4,8 @@ from .Layout import Layout
 class VerticalLayout(Layout):
     """Вертикальный layout (колонка)"""
 
+    __slots__ = ()
+
     def __init__(
         self,
         justify_content="center",
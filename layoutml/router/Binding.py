@@ -0,0 +1,112 @@
+import typing
+from typing import Any, Callable, Dict, Tuple
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+TRUE_VALUES = {"true", "1", "yes", "on"}
+FALSE_VALUES = {"false", "0", "no", "off"}
+
+
+class BindingError(Exception):
+    """Ошибка привязки параметров запроса к аргументам обработчика"""
+
+    def __init__(self, error: str, parameter: str, expected: str = None):
+        super().__init__(error)
+        self.content = {"error": error, "parameter": parameter}
+        if expected:
+            self.content["expected"] = expected
+
+
+def _to_bool(value: str) -> bool:
+    lowered = value.lower()
+    if lowered in TRUE_VALUES:
+        return True
+    if lowered in FALSE_VALUES:
+        return False
+    raise ValueError(f"not a bool: {value}")
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _get_coercer(annotation: Any) -> Tuple[Callable[[str], Any], bool]:
+    """Функция преобразования строки по аннотации и признак списка"""
+    origin = typing.get_origin(annotation)
+    if origin is typing.Union:
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return _get_coercer(args[0])
+        return _identity, False
+    if annotation is list or origin is list:
+        args = typing.get_args(annotation)
+        item_coercer, _ = _get_coercer(args[0]) if args else (_identity, False)
+        return item_coercer, True
+    if annotation is bool:
+        return _to_bool, False
+    if annotation in (int, float):
+        return annotation, False
+    return _identity, False
+
+
+def compile_binding(parameters: Dict[str, Dict]) -> Callable[[Request, Response, Dict[str, Any]], Dict[str, Any]]:
+    """
+    Собрать план привязки аргументов по результату get_parameters
+
+    Вся работа с аннотациями выполняется один раз при регистрации маршрута.
+    Возвращаемая функция bind(request, response, path_params) отдаёт готовые
+    kwargs для обработчика или выбрасывает BindingError.
+    """
+    request_names = []
+    response_names = []
+    value_params = []
+    for name, info in parameters.items():
+        annotation = info["annotation"]
+        if annotation is Request:
+            request_names.append(name)
+        elif annotation is Response:
+            response_names.append(name)
+        else:
+            coerce, is_list = _get_coercer(annotation)
+            value_params.append((name, coerce, is_list, info["is_required"], info["default"], info["type_name"]))
+    allowed = frozenset(param[0] for param in value_params)
+
+    def bind(request: Request, response: Response, path_params: Dict[str, Any]) -> Dict[str, Any]:
+        query_params = request.query_params
+        for name in query_params.keys():
+            if name not in allowed:
+                raise BindingError(f"Unexpected parameter: {name}", name)
+
+        kwargs = {}
+        for name in request_names:
+            kwargs[name] = request
+        for name in response_names:
+            kwargs[name] = response
+
+        for name, coerce, is_list, is_required, default, type_name in value_params:
+            try:
+                if name in path_params:
+                    value = path_params[name]
+                    kwargs[name] = coerce(value) if isinstance(value, str) else value
+                elif is_list:
+                    values = query_params.getlist(name)
+                    if values:
+                        kwargs[name] = [coerce(value) for value in values]
+                    elif is_required:
+                        raise BindingError(f"Missing required parameter: {name}", name)
+                    else:
+                        kwargs[name] = default
+                else:
+                    value = query_params.get(name)
+                    if value is not None:
+                        kwargs[name] = coerce(value)
+                    elif is_required:
+                        raise BindingError(f"Missing required parameter: {name}", name)
+                    else:
+                        kwargs[name] = default
+            except (ValueError, TypeError):
+                raise BindingError(f"Invalid value for parameter: {name}", name, expected=type_name)
+        return kwargs
+
+    return bind
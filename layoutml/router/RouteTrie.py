@@ -0,0 +1,149 @@
+import re
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+PARAM_REGEX = re.compile(r"^\{(?P<name>[A-Za-z_][A-Za-z0-9_]*)(?::(?P<convertor>[a-z]+))?\}$")
+
+
+INT_REGEX = re.compile(r"^[0-9]+$")
+FLOAT_REGEX = re.compile(r"^[0-9]+(\.[0-9]+)?$")
+
+
+def _convert_str(value: str) -> str:
+    if not value:
+        raise ValueError("empty segment")
+    return value
+
+
+def _convert_int(value: str) -> int:
+    if not INT_REGEX.match(value):
+        raise ValueError(f"not an int: {value}")
+    return int(value)
+
+
+def _convert_float(value: str) -> float:
+    if not FLOAT_REGEX.match(value):
+        raise ValueError(f"not a float: {value}")
+    return float(value)
+
+
+# Конвертеры параметров пути в порядке приоритета при сопоставлении:
+# сначала более строгие типы, затем str. path всегда проверяется последним.
+CONVERTORS: Dict[str, Callable[[str], Any]] = {
+    "int": _convert_int,
+    "float": _convert_float,
+    "uuid": uuid.UUID,
+    "str": _convert_str,
+}
+
+
+class RouteNode:
+    """Узел дерева маршрутов: один сегмент пути"""
+
+    def __init__(self):
+        self.static: Dict[str, "RouteNode"] = {}
+        self.params: Dict[str, "RouteNode"] = {}
+        self.route: Optional[Dict] = None
+        self.param_names: List[str] = []
+
+
+class RouteTrie:
+    """
+    Дерево маршрутов по сегментам пути
+
+    Поддерживает параметры пути {slug}, {id:int}, {value:float}, {key:uuid}
+    и {path:path} (остаток пути, только последним сегментом). Поиск идёт
+    по сегментам, поэтому время не зависит от числа маршрутов. Конфликты
+    (один и тот же шаблон для разных обработчиков) обнаруживаются при добавлении.
+    """
+
+    def __init__(self):
+        self.root = RouteNode()
+
+    @staticmethod
+    def _split(path: str) -> List[str]:
+        return path[1:].split("/") if path.startswith("/") else path.split("/")
+
+    def insert(self, path: str, route_info: Dict) -> List[str]:
+        """Добавить маршрут, вернуть имена параметров пути"""
+        node = self.root
+        param_names: List[str] = []
+        segments = self._split(path)
+        for index, segment in enumerate(segments):
+            match = PARAM_REGEX.match(segment)
+            if match is None:
+                if "{" in segment or "}" in segment:
+                    raise ValueError(f"Параметр пути должен занимать весь сегмент: '{segment}' в маршруте '{path}'")
+                node = node.static.setdefault(segment, RouteNode())
+                continue
+
+            name = match.group("name")
+            convertor = match.group("convertor") or "str"
+            if convertor != "path" and convertor not in CONVERTORS:
+                raise ValueError(f"Неизвестный тип параметра '{convertor}' в маршруте '{path}'")
+            if convertor == "path" and index != len(segments) - 1:
+                raise ValueError(f"Параметр {{{name}:path}} должен быть последним сегментом маршрута '{path}'")
+            if name in param_names:
+                raise ValueError(f"Параметр '{name}' повторяется в маршруте '{path}'")
+            param_names.append(name)
+            node = node.params.setdefault(convertor, RouteNode())
+
+        if node.route is not None and node.route["func"] is not route_info["func"]:
+            raise ValueError(
+                f"Конфликт маршрутов: '{path}' совпадает с уже зарегистрированным "
+                f"'{node.route['original_path']}' ({node.route['func'].__name__})"
+            )
+        node.route = route_info
+        node.param_names = param_names
+        return param_names
+
+    def match(self, path: str) -> Optional[Tuple[Dict, Dict[str, Any]]]:
+        """
+        Найти маршрут по пути: (route_info, параметры пути) или None
+
+        Поиск идёт без возврата: статический сегмент побеждает параметры,
+        из параметров выбирается первый подходящий по порядку CONVERTORS.
+        Если выбранная ветвь не заканчивается маршрутом, используется
+        ближайший {name:path} выше по пути. Время поиска линейно по длине
+        пути при любом наборе пересекающихся маршрутов.
+        """
+        segments = self._split(path)
+        node = self.root
+        values: List[Any] = []
+        fallback: Optional[Tuple[RouteNode, List[Any]]] = None
+        for index, segment in enumerate(segments):
+            # Остаток пути {name:path} не может быть пустым: "/files" и "/files/"
+            # не совпадают с "/files/{path:path}"
+            tail = node.params.get("path")
+            if tail is not None and tail.route is not None:
+                value = "/".join(segments[index:])
+                if value:
+                    fallback = (tail, values + [value])
+
+            child = node.static.get(segment)
+            if child is None:
+                child = self._match_param(node, segment, values)
+            if child is None:
+                break
+            node = child
+        else:
+            if node.route is not None:
+                return node.route, dict(zip(node.param_names, values))
+
+        if fallback is None:
+            return None
+        node, values = fallback
+        return node.route, dict(zip(node.param_names, values))
+
+    @staticmethod
+    def _match_param(node: RouteNode, segment: str, values: List[Any]) -> Optional[RouteNode]:
+        for convertor, convert in CONVERTORS.items():
+            child = node.params.get(convertor)
+            if child is None:
+                continue
+            try:
+                values.append(convert(segment))
+            except ValueError:
+                continue
+            return child
+        return None
@@ -1,10 +1,12 @@
 import re
-from typing import Dict, Callable, Any, Optional
+from typing import Dict, Callable, Any, Optional, Tuple
 import inspect
 from starlette.requests import Request
 from starlette.responses import JSONResponse, Response
 
 from layoutml import Page
+from .RouteTrie import RouteTrie
+from .Binding import BindingError, compile_binding
 
 
 def get_parameters(func) -> dict:
@@ -32,20 +34,24 @@ class Router:
         self.routes: Dict[str, Dict] = {}
         self.prefix = prefix.rstrip("/")
         self._child_routers: Dict[str, "Router"] = {}
+        self._trie = RouteTrie()
 
     def route(self, path: str):
         def decorator(func: Callable):
             full_path = f"{self.prefix}{path}"
             original_path = f"{self.prefix}{path}"
             parameters = get_parameters(func)
-            self.routes[full_path] = {
+            route_info = {
                 "func": func,
                 "original_path": original_path,
-                "pattern": None,
-                "has_params": False if parameters else True,
                 "parameters": parameters,
+                "binding": compile_binding(parameters),
                 "is_async": inspect.iscoroutinefunction(func),
             }
+            path_params = self._trie.insert(full_path, route_info)
+            route_info["path_params"] = path_params
+            route_info["has_params"] = bool(path_params)
+            self.routes[full_path] = route_info
             return func
 
         return decorator
@@ -67,58 +73,45 @@ class Router:
         for route_path, route_info in router.routes.items():
             child_route_path = route_path.replace(router.prefix, "", 1)
             full_route_path = f"{full_prefix}{child_route_path}"
-            self.routes[full_route_path] = {
+            included_route_info = {
                 "func": route_info["func"],
                 "original_path": full_route_path,
-                "pattern": route_info["pattern"],
                 "parameters": route_info["parameters"],
+                "binding": route_info["binding"],
+                "path_params": route_info["path_params"],
                 "has_params": route_info["has_params"],
                 "is_async": route_info["is_async"],
             }
+            self._trie.insert(full_route_path, included_route_info)
+            self.routes[full_route_path] = included_route_info
 
         for child_prefix, child_router in router._child_routers.items():
             nested_child_prefix = child_prefix.replace(router.prefix, "", 1)
             new_prefix = f"{full_prefix}{nested_child_prefix}"
             self.include_router(child_router, new_prefix)
 
-    def _match_route(self, path: str) -> Optional[Dict]:
-        if path in self.routes:
-            return self.routes[path]
-        for route_path, route_info in self.routes.items():
-            if route_info["has_params"] and route_info["pattern"]:
-                match = route_info["pattern"].match(path)
-                if match:
-                    return {**route_info, "params": match.groupdict()}
-        return None
-
-    async def dispatch(self, request: Request, response: Response) -> Any:
-        query_params = {}
-        for param_name in request.query_params:
-            query_params[param_name] = request.query_params[param_name]
-        route_info = self._match_route(request.url.path)
-        if not route_info:
+    def match(self, path: str) -> Optional[Tuple[Dict, Dict[str, Any]]]:
+        """Найти маршрут по пути: (route_info, параметры пути) или None"""
+        return self._trie.match(path)
+
+    async def dispatch(self, request: Request, response: Response, route_match: Optional[Tuple[Dict, Dict]] = None) -> Any:
+        if route_match is None:
+            route_match = self.match(request.url.path)
+        if not route_match:
             raise ValueError(f"Route not found: {request.url.path}")
 
+        route_info, path_params = route_match
+        request.scope["path_params"] = path_params
+        try:
+            kwargs = route_info["binding"](request, response, path_params)
+        except BindingError as e:
+            return JSONResponse(status_code=400, content=e.content)
+
         func = route_info["func"]
-        for parameter_name in query_params:
-            if parameter_name not in route_info["parameters"]:
-                return JSONResponse(status_code=400, content={"error": f"Unexpected parameter: {parameter_name}"})
-
-        for parameter_name, parameter_data in route_info["parameters"].items():
-            if parameter_data["annotation"] is Request:
-                query_params[parameter_name] = request
-            elif parameter_data["annotation"] is Response:
-                query_params[parameter_name] = response
-            elif parameter_data["is_required"]:
-                if parameter_name not in query_params:
-                    return JSONResponse(
-                        status_code=400,
-                        content={"error": f"Missing required parameter: {parameter_name}"},
-                    )
         if route_info["is_async"]:
-            return await func(**query_params)
+            return await func(**kwargs)
         else:
-            return func(**query_params)
+            return func(**kwargs)
 
     def get_all_routes(self) -> Dict[str, Any]:
         return self.routes.copy()
@@ -0,0 +1,174 @@
+import asyncio
+from typing import List, Optional, Tuple
+
+from starlette.exceptions import HTTPException
+
+
+class HTTPParseError(HTTPException):
+    """Ошибка разбора HTTP запроса, status_code уходит клиенту как есть"""
+
+
+class HTTPRequestParser:
+    """
+    Потоковый разбор одного HTTP/1.1 запроса из asyncio.StreamReader
+
+    Заголовки читаются целиком до пустой строки, тело отдаётся частями
+    через receive() (ASGI), по Content-Length или chunked. Работает с байтами,
+    строки декодируются только там, где это нужно для scope.
+    """
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        max_header_size: int = 64 * 1024,
+        max_body_size: int = 16 * 1024 * 1024,
+        chunk_size: int = 64 * 1024,
+    ):
+        self.reader = reader
+        self.max_header_size = max_header_size
+        self.max_body_size = max_body_size
+        self.chunk_size = chunk_size
+
+        self.method: str = ""
+        self.path: str = ""
+        self.raw_path: bytes = b""
+        self.query_string: bytes = b""
+        self.http_version: str = "1.1"
+        self.headers: List[Tuple[bytes, bytes]] = []
+
+        self._chunked = False
+        self._remaining = 0
+        self._received = 0
+        self._body_done = True
+
+    async def read_head(self) -> "HTTPRequestParser":
+        """Прочитать строку запроса и заголовки"""
+        try:
+            head = await self.reader.readuntil(b"\r\n\r\n")
+        except asyncio.LimitOverrunError:
+            raise HTTPParseError(431, "Request header fields too large")
+        if len(head) > self.max_header_size:
+            raise HTTPParseError(431, "Request header fields too large")
+
+        lines = head[:-4].split(b"\r\n")
+        request_line = lines[0].split(b" ")
+        if len(request_line) != 3 or not request_line[2].startswith(b"HTTP/"):
+            raise HTTPParseError(400, "Malformed request line")
+        method, target, version = request_line
+
+        content_length: Optional[int] = None
+        codings = []
+        headers = []
+        for line in lines[1:]:
+            name, sep, value = line.partition(b":")
+            if not sep:
+                raise HTTPParseError(400, "Malformed header line")
+            name = name.strip().lower()
+            value = value.strip()
+            headers.append((name, value))
+            if name == b"content-length":
+                # Несколько значений длины (повтор заголовка или список через
+                # запятую) прокси и сервер могут понять по-разному
+                if content_length is not None:
+                    raise HTTPParseError(400, "Multiple Content-Length headers")
+                if not value.isdigit():
+                    raise HTTPParseError(400, "Invalid Content-Length")
+                content_length = int(value)
+            elif name == b"transfer-encoding":
+                codings.extend(coding.strip().lower() for coding in value.split(b","))
+
+        chunked = bool(codings)
+        if chunked:
+            # Длина тела с Transfer-Encoding определяется им, а запрос с обоими
+            # заголовками — признак подмены запроса (request smuggling)
+            if content_length is not None:
+                raise HTTPParseError(400, "Content-Length with Transfer-Encoding")
+            if codings[-1] != b"chunked":
+                raise HTTPParseError(400, "Invalid Transfer-Encoding")
+            if len(codings) > 1:
+                raise HTTPParseError(501, "Unsupported Transfer-Encoding")
+
+        if content_length and content_length > self.max_body_size:
+            raise HTTPParseError(413, "Request body too large")
+
+        self.method = method.decode("ascii", errors="replace")
+        self.raw_path, _, self.query_string = target.partition(b"?")
+        self.path = self.raw_path.decode("latin-1")
+        self.http_version = version[5:].decode("ascii", errors="replace")
+        self.headers = headers
+
+        self._chunked = chunked
+        self._remaining = 0 if chunked else (content_length or 0)
+        self._received = 0
+        self._body_done = not chunked and not self._remaining
+        return self
+
+    def get_header(self, name: bytes) -> Optional[bytes]:
+        """Получить значение заголовка по имени в нижнем регистре"""
+        for key, value in self.headers:
+            if key == name:
+                return value
+        return None
+
+    def get_scope(self, client=None, server=None) -> dict:
+        """Собрать ASGI scope для разобранного запроса"""
+        return {
+            "type": "http",
+            "method": self.method,
+            "path": self.path,
+            "raw_path": self.raw_path,
+            "headers": self.headers,
+            "query_string": self.query_string,
+            "client": client,
+            "server": server,
+            "scheme": "http",
+            "http_version": self.http_version,
+        }
+
+    async def receive(self) -> dict:
+        """ASGI receive: отдаёт тело запроса частями"""
+        if self._body_done:
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        if self._chunked:
+            chunk = await self._read_chunk()
+        else:
+            chunk = await self.reader.read(min(self._remaining, self.chunk_size))
+            if not chunk:
+                self._body_done = True
+                return {"type": "http.disconnect"}
+            self._remaining -= len(chunk)
+            self._body_done = self._remaining == 0
+
+        self._received += len(chunk)
+        if self._received > self.max_body_size:
+            raise HTTPParseError(413, "Request body too large")
+        return {"type": "http.request", "body": chunk, "more_body": not self._body_done}
+
+    async def _read_chunk(self) -> bytes:
+        """Прочитать один chunk тела в chunked transfer encoding"""
+        size_line = await self.reader.readuntil(b"\r\n")
+        try:
+            size = int(size_line.split(b";", 1)[0].strip(), 16)
+        except ValueError:
+            raise HTTPParseError(400, "Invalid chunk size")
+
+        if size == 0:
+            # Пропускаем трейлеры до пустой строки
+            while await self.reader.readuntil(b"\r\n") != b"\r\n":
+                pass
+            self._body_done = True
+            return b""
+
+        if self._received + size > self.max_body_size:
+            raise HTTPParseError(413, "Request body too large")
+        data = await self.reader.readexactly(size)
+        await self.reader.readexactly(2)
+        return data
+
+    async def drain(self) -> None:
+        """Дочитать непрочитанное обработчиком тело, чтобы перейти к следующему запросу"""
+        while not self._body_done:
+            message = await self.receive()
+            if message["type"] == "http.disconnect":
+                raise ConnectionResetError("Client disconnected while sending body")
@@ -0,0 +1,99 @@
+import os
+import gzip
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# MIME типы, которые имеет смысл сжимать (картинки уже сжаты)
+COMPRESSIBLE_TYPES = (
+    "text/css",
+    "text/html",
+    "text/plain",
+    "application/javascript",
+    "application/json",
+    "image/svg+xml",
+)
+
+
+def _get_compressors() -> List[Tuple[str, str, Callable[[bytes], bytes]]]:
+    """Доступные кодировки в порядке предпочтения: (encoding, suffix, compress)"""
+    compressors = []
+    if brotli is not None:
+        compressors.append(("br", ".br", lambda data: brotli.compress(data, quality=11)))
+    compressors.append(("gzip", ".gz", lambda data: gzip.compress(data, compresslevel=9, mtime=0)))
+    return compressors
+
+
+def is_compressible(media_type: str) -> bool:
+    return media_type.split(";", 1)[0].strip() in COMPRESSIBLE_TYPES
+
+
+def atomic_write(path: str, data: bytes) -> None:
+    """Записать файл через временный файл и os.replace"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def precompress_file(path: str, min_size: int = 256) -> Dict[str, str]:
+    """
+    Создать рядом с файлом сжатые варианты (.br, .gz) и вернуть {encoding: путь}
+
+    Вариант пересоздаётся, только если его mtime не совпадает с исходным
+    файлом, поэтому каждый файл сжимается один раз. Варианты, которые
+    не меньше оригинала, не сохраняются.
+    """
+    stat_result = os.stat(path)
+    variants: Dict[str, str] = {}
+    if stat_result.st_size < min_size:
+        return variants
+
+    data: Optional[bytes] = None
+    for encoding, suffix, compress in _get_compressors():
+        variant_path = path + suffix
+        try:
+            is_fresh = os.stat(variant_path).st_mtime_ns == stat_result.st_mtime_ns
+        except OSError:
+            is_fresh = False
+
+        if not is_fresh:
+            if data is None:
+                with open(path, "rb") as f:
+                    data = f.read()
+            compressed = compress(data)
+            if len(compressed) >= len(data):
+                if os.path.exists(variant_path):
+                    os.remove(variant_path)
+                continue
+            atomic_write(variant_path, compressed)
+            os.utime(variant_path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns))
+        variants[encoding] = variant_path
+    return variants
+
+
+def select_encoding(accept_encoding: Optional[str], available: Iterable[str]) -> Optional[str]:
+    """Выбрать кодировку из доступных по заголовку Accept-Encoding (с учётом q)"""
+    if not accept_encoding:
+        return None
+    preferences: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        preferences[token.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in available:
+        quality = preferences.get(encoding, preferences.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
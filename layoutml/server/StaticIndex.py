@@ -0,0 +1,158 @@
+import os
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Optional
+
+from .Precompress import is_compressible, precompress_file
+
+
+class StaticAsset:
+    """Запись индекса: stat файла, MIME тип и валидаторы для условных запросов"""
+
+    def __init__(self, path: str, stat_result: os.stat_result, media_type: str):
+        self.path = path
+        self.stat_result = stat_result
+        self.media_type = media_type
+        # Сильный ETag из размера и mtime в наносекундах, как у nginx
+        self.etag = f'"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+        self.last_modified = formatdate(stat_result.st_mtime, usegmt=True)
+        # Предварительно сжатые варианты: {"br": StaticAsset, "gzip": StaticAsset}
+        self.variants: Dict[str, "StaticAsset"] = {}
+
+    def is_changed(self, stat_result: os.stat_result) -> bool:
+        return stat_result.st_size != self.stat_result.st_size or stat_result.st_mtime_ns != self.stat_result.st_mtime_ns
+
+    def is_not_modified(self, if_none_match: Optional[str], if_modified_since: Optional[str]) -> bool:
+        """Проверка If-None-Match / If-Modified-Since, True — можно ответить 304"""
+        if if_none_match:
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            return "*" in tags or self.etag in tags or f"W/{self.etag}" in tags
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return int(self.stat_result.st_mtime) <= since
+        return False
+
+
+class StaticIndex:
+    """
+    Индекс статических файлов, строится один раз при запуске
+
+    Сопоставляет URL путь с StaticAsset, содержимое небольших файлов
+    держит в LRU кэше с ограничением по суммарному размеру.
+    С watch=True каждый запрос сверяет stat файла и сбрасывает устаревшие
+    записи — режим для разработки. С precompress=True для текстовых файлов
+    один раз создаются .br/.gz варианты.
+    """
+
+    skip_dirs = {"__pycache__", "venv", "node_modules"}
+
+    def __init__(
+        self,
+        mime_types: Dict[str, str],
+        root: str = ".",
+        max_cache_bytes: int = 32 * 1024 * 1024,
+        max_file_size: int = 256 * 1024,
+        cache_control: str = "public, max-age=3600",
+        watch: bool = False,
+        precompress: bool = False,
+    ):
+        self.mime_types = mime_types
+        self.root = os.path.abspath(root)
+        self.max_cache_bytes = max_cache_bytes
+        self.max_file_size = max_file_size
+        self.cache_control = cache_control
+        self.watch = watch
+        self.precompress = precompress
+
+        self.assets: Dict[str, StaticAsset] = {}
+        self.built = False
+        self._cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self._cache_bytes = 0
+
+    def _media_type(self, path: str) -> Optional[str]:
+        for ext, mime_type in self.mime_types.items():
+            if path.endswith(ext):
+                return mime_type
+        return None
+
+    def _add(self, url_path: str, file_path: str) -> Optional[StaticAsset]:
+        media_type = self._media_type(file_path)
+        if media_type is None:
+            return None
+        try:
+            stat_result = os.stat(file_path)
+        except OSError:
+            return None
+        asset = StaticAsset(file_path, stat_result, media_type)
+        if self.precompress and is_compressible(media_type):
+            for encoding, variant_path in precompress_file(file_path).items():
+                asset.variants[encoding] = StaticAsset(variant_path, os.stat(variant_path), media_type)
+        self.assets[url_path] = asset
+        return asset
+
+    def build(self) -> "StaticIndex":
+        """Обойти root и проиндексировать все файлы с известными расширениями"""
+        self.assets.clear()
+        self.invalidate()
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if not d.startswith(".") and d not in self.skip_dirs]
+            for filename in filenames:
+                file_path = os.path.join(dirpath, filename)
+                url_path = "/" + os.path.relpath(file_path, self.root).replace(os.sep, "/")
+                self._add(url_path, file_path)
+        self.built = True
+        return self
+
+    def get(self, url_path: str) -> Optional[StaticAsset]:
+        if not self.built:
+            self.build()
+        asset = self.assets.get(url_path)
+        if not self.watch:
+            return asset
+
+        if asset is None:
+            file_path = os.path.join(self.root, url_path.lstrip("/"))
+            if ".." in url_path or not os.path.isfile(file_path):
+                return None
+            return self._add(url_path, file_path)
+        try:
+            stat_result = os.stat(asset.path)
+        except OSError:
+            self.assets.pop(url_path, None)
+            self.invalidate(url_path)
+            return None
+        if asset.is_changed(stat_result):
+            self.invalidate(url_path)
+            asset = self._add(url_path, asset.path)
+        return asset
+
+    def read(self, key: str, asset: StaticAsset) -> Optional[bytes]:
+        """Содержимое небольшого файла из LRU кэша, None — отдавать потоком"""
+        content = self._cache.get(key)
+        if content is not None:
+            self._cache.move_to_end(key)
+            return content
+        size = asset.stat_result.st_size
+        if size > self.max_file_size or size > self.max_cache_bytes:
+            return None
+
+        with open(asset.path, "rb") as f:
+            content = f.read()
+        self._cache[key] = content
+        self._cache_bytes += len(content)
+        while self._cache_bytes > self.max_cache_bytes:
+            _, evicted = self._cache.popitem(last=False)
+            self._cache_bytes -= len(evicted)
+        return content
+
+    def invalidate(self, url_path: Optional[str] = None) -> None:
+        """Сбросить кэш содержимого одного файла (со сжатыми вариантами) или целиком"""
+        if url_path is None:
+            self._cache.clear()
+            self._cache_bytes = 0
+            return
+        for key in [key for key in self._cache if key == url_path or key.startswith(f"{url_path}|")]:
+            self._cache_bytes -= len(self._cache.pop(key))
@@ -0,0 +1,130 @@
+import os
+import time
+import signal
+import socket
+import logging
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerSupervisor:
+    """
+    Prefork-супервизор для встроенного сервера
+
+    Родительский процесс запускает workers дочерних процессов через fork,
+    перезапускает упавших и по SIGTERM/SIGINT корректно их останавливает.
+    Слушающий сокет либо создаётся один раз в родителе и наследуется
+    воркерами, либо (reuse_port=True) каждый воркер открывает свой сокет
+    с SO_REUSEPORT и соединения распределяет ядро.
+    """
+
+    # Воркер, проживший меньше этого времени, считается упавшим при старте
+    min_worker_lifetime: float = 1.0
+
+    def __init__(
+        self,
+        target: Callable[[Optional[socket.socket]], None],
+        workers: int,
+        host: str,
+        port: int,
+        reuse_port: bool = False,
+        graceful_timeout: float = 30.0,
+    ):
+        if not hasattr(os, "fork"):
+            raise RuntimeError("Режим нескольких воркеров требует os.fork и недоступен на этой платформе")
+        if reuse_port and not hasattr(socket, "SO_REUSEPORT"):
+            raise RuntimeError("SO_REUSEPORT не поддерживается на этой платформе")
+
+        self.target = target
+        self.workers = workers
+        self.host = host
+        self.port = port
+        self.reuse_port = reuse_port
+        self.graceful_timeout = graceful_timeout
+
+        self._sock: Optional[socket.socket] = None
+        self._children: Dict[int, float] = {}
+        self._stopping = False
+
+    def _bind(self) -> socket.socket:
+        """Создать общий слушающий сокет, который унаследуют воркеры"""
+        sock = socket.create_server((self.host, self.port), reuse_port=False, backlog=2048)
+        sock.set_inheritable(True)
+        return sock
+
+    def _spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            exit_code = 0
+            try:
+                self.target(self._sock)
+            except BaseException:
+                logger.exception("Worker %s crashed", os.getpid())
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+        self._children[pid] = time.monotonic()
+        logger.info("Worker %s started", pid)
+
+    def _handle_stop(self, signum, frame) -> None:
+        self._stopping = True
+
+    def run(self) -> None:
+        if not self.reuse_port:
+            self._sock = self._bind()
+
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+
+        for _ in range(self.workers):
+            self._spawn()
+
+        try:
+            while not self._stopping:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+                if pid == 0:
+                    time.sleep(0.2)
+                    continue
+                started = self._children.pop(pid, None)
+                if started is None:
+                    continue
+                logger.warning("Worker %s exited with status %s, restarting", pid, os.waitstatus_to_exitcode(status))
+                if time.monotonic() - started < self.min_worker_lifetime:
+                    # Не перезапускаем в бесконечном цикле воркер, падающий при старте
+                    time.sleep(self.min_worker_lifetime)
+                if not self._stopping:
+                    self._spawn()
+        finally:
+            self.shutdown()
+
+    def shutdown(self) -> None:
+        """Послать воркерам SIGTERM и дождаться их, по тайм-ауту — SIGKILL"""
+        for pid in self._children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+        deadline = time.monotonic() + self.graceful_timeout
+        while self._children and time.monotonic() < deadline:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                time.sleep(0.1)
+            else:
+                self._children.pop(pid, None)
+
+        for pid in self._children:
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+        self._children.clear()
+
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        logger.info("All workers stopped")
@@ -0,0 +1,15 @@
+from .HTTPRequestParser import HTTPRequestParser, HTTPParseError
+from .WorkerSupervisor import WorkerSupervisor
+from .StaticIndex import StaticIndex, StaticAsset
+from .Precompress import precompress_file, select_encoding, atomic_write
+
+__all__ = [
+    "HTTPRequestParser",
+    "HTTPParseError",
+    "WorkerSupervisor",
+    "StaticIndex",
+    "StaticAsset",
+    "precompress_file",
+    "select_encoding",
+    "atomic_write",
+]
@@ -0,0 +1,73 @@
+import re
+from typing import Any, List
+
+from .Slot import Slot
+
+_MARKER_RE = re.compile("(\x00slot:[^\x00]*\x00)")
+
+
+class CompiledTemplate:
+    """
+    Предварительно отрендеренный элемент или страница
+
+    HTML разбит на неизменяемые байтовые сегменты, между которыми стоят
+    слоты. render() только склеивает сегменты со значениями слотов, поэтому
+    его стоимость зависит от объёма динамического содержимого, а не от
+    размера дерева. Если исходный элемент изменился, шаблон собирается заново
+    при следующем render().
+    """
+
+    def __init__(self, source: Any, encoding: str = "utf-8"):
+        self.source = source
+        self.encoding = encoding
+        self.segments: List[bytes] = []
+        self.slots: List[Slot] = []
+        self.compile()
+
+    def compile(self) -> "CompiledTemplate":
+        """Отрендерить исходный элемент и разрезать HTML по меткам слотов"""
+        pieces = _MARKER_RE.split(self.source.get_html())
+        self.segments = [piece.encode(self.encoding) for piece in pieces[0::2]]
+        # При пересборке слоты ищутся сначала среди уже найденных: реестр
+        # держит их слабо, и единственная ссылка может быть здесь
+        known = {slot.marker: slot for slot in self.slots}
+        self.slots = [known.get(marker) or Slot.take(marker) for marker in pieces[1::2]]
+        return self
+
+    @property
+    def slot_names(self) -> List[str]:
+        names = []
+        for slot in self.slots:
+            if slot.name not in names:
+                names.append(slot.name)
+        return names
+
+    def render(self, **values: Any) -> bytes:
+        """
+        Подставить значения слотов
+
+        Пример:
+        compiled.render(user_name="Anna", items=[Paragraph(text="1"), "<hr>"])
+        """
+        if self.source._dirty:
+            self.compile()
+
+        segments = self.segments
+        parts = [segments[0]]
+        for index, slot in enumerate(self.slots, 1):
+            if slot.name in values:
+                value = values[slot.name]
+            elif slot.required:
+                raise TypeError(f"render() не получил значение слота '{slot.name}'")
+            else:
+                value = slot.default
+            parts.append(slot.render(value))
+            parts.append(segments[index])
+        return b"".join(parts)
+
+    def render_str(self, **values: Any) -> str:
+        return self.render(**values).decode(self.encoding)
+
+    def __repr__(self) -> str:
+        return f"CompiledTemplate(slots={self.slot_names}, size={sum(map(len, self.segments))})"
+
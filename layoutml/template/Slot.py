@@ -0,0 +1,131 @@
+import html
+import itertools
+import weakref
+from typing import Any, Dict
+
+_MISSING = object()
+
+
+class Slot:
+    """
+    Именованное динамическое место в дереве элементов
+
+    Слот можно добавить как элемент (в Body, Layout, список) или передать
+    вместо строки в атрибут или текст элемента. При рендеринге вместо слота
+    выводится служебная метка, по которой CompiledTemplate разрезает HTML
+    на неизменяемые сегменты и подставляет значения.
+
+    Пример:
+    page.add_element(Paragraph(text=Slot("user_name", escape=True)))
+    page.add_element(Slot("items"))
+    """
+
+    # Метка -> слот. Метки уникальны, поэтому одноимённые слоты
+    # с разными параметрами не конфликтуют. Слот, попавший в текст только
+    # через f-строку или сложение, должен дожить до compile(), поэтому до
+    # первой компиляции на него есть сильная ссылка в _pending. compile()
+    # забирает слоты из _pending в CompiledTemplate, и дальше реестр держит
+    # их только слабо
+    _registry: "weakref.WeakValueDictionary[str, Slot]" = weakref.WeakValueDictionary()
+    _pending: Dict[str, "Slot"] = {}
+    _counter = itertools.count()
+
+    def __init__(self, name: str, default: Any = _MISSING, escape: bool = False, separator: str = ""):
+        self.name = name
+        self.default = default
+        self.escape = escape
+        self.separator = separator
+        self.marker = f"\x00slot:{name}:{next(Slot._counter)}\x00"
+        Slot._register(self)
+
+    @staticmethod
+    def _register(slot: "Slot") -> None:
+        Slot._registry[slot.marker] = slot
+        Slot._pending[slot.marker] = slot
+
+    @classmethod
+    def from_marker(cls, marker: str) -> "Slot":
+        return cls._registry[marker]
+
+    @classmethod
+    def take(cls, marker: str) -> "Slot":
+        """Найти слот по метке и снять с него сильную ссылку реестра"""
+        slot = cls._pending.pop(marker, None)
+        return slot if slot is not None else cls._registry[marker]
+
+    @property
+    def required(self) -> bool:
+        return self.default is _MISSING
+
+    def render(self, value: Any) -> bytes:
+        """Преобразовать значение слота в байты"""
+        if isinstance(value, bytes):
+            return value
+        return self._to_str(value).encode("utf-8")
+
+    def _to_str(self, value: Any) -> str:
+        if value is None:
+            return ""
+        if isinstance(value, str):
+            return html.escape(value) if self.escape else value
+        if isinstance(value, bytes):
+            return value.decode("utf-8")
+        if hasattr(value, "get_html"):
+            return value.get_html()
+        if isinstance(value, (list, tuple)):
+            return self.separator.join(self._to_str(item) for item in value)
+        return self._to_str(str(value))
+
+    # Слот ведёт себя как элемент дерева: рендерится в метку и не имеет стилей
+    def get_html(self, *args, **kwargs) -> str:
+        return self.marker
+
+    def iter_html(self, tab: int = 0):
+        yield self.marker
+
+    def render_into(self, buf: list, tab: int = 0) -> None:
+        buf.append(self.marker)
+
+    def get_styles(self, *args, **kwargs) -> dict:
+        return {}
+
+    def collect_styles(self, table: list, space: bool = True, atomic: bool = False) -> None:
+        pass
+
+    def get_object_name(self) -> str:
+        return self.name
+
+    def __str__(self) -> str:
+        return self.marker
+
+    def __format__(self, format_spec: str) -> str:
+        return self.marker
+
+    def __add__(self, other: str) -> str:
+        return self.marker + other
+
+    def __radd__(self, other: str) -> str:
+        return other + self.marker
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (_restore_slot, (self.name, self.default, self.escape, self.separator, self.marker))
+
+    def __repr__(self) -> str:
+        return f'Slot("{self.name}")'
+
+
+def _restore_slot(name, default, escape, separator, marker) -> Slot:
+    """Восстановить слот после pickle с той же меткой"""
+    slot = Slot._registry.get(marker)
+    if slot is None:
+        slot = Slot.__new__(Slot)
+        slot.name = name
+        slot.default = default
+        slot.escape = escape
+        slot.separator = separator
+        slot.marker = marker
+        Slot._register(slot)
+    return slot
@@ -0,0 +1,4 @@
+from .Slot import Slot
+from .CompiledTemplate import CompiledTemplate
+
+__all__ = ["Slot", "CompiledTemplate"]
@@ -0,0 +1,40 @@
+import asyncio
+
+from starlette.requests import Request
+
+from layoutml import LayoutML, Page
+from layoutml.elements import Paragraph
+
+
+def make_app() -> LayoutML:
+    app = LayoutML(bundle_css=True)
+    page = Page(object_name="home")
+    paragraph = Paragraph(text="x", object_name="text")
+    paragraph.object_styles.set_color("red")
+    page.add_element(paragraph)
+    app.include_page(page)
+    return app
+
+
+def get(app: LayoutML, path: str):
+    request = Request({"type": "http", "method": "GET", "path": path, "headers": [], "query_string": b""})
+    return asyncio.run(app._serve_static_file(request))
+
+
+def test_manifest_from_outdir_serves_stylesheets(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    make_app().build("dist")
+
+    app = make_app()
+    app.use_css_manifest("dist/layoutml-manifest.json")
+    app.ensure_css_generated()
+    href = app._pages[0].head.links[-1]["href"]
+    assert href.startswith("/styles/")
+    stylesheet = href.lstrip("/")
+    assert not (tmp_path / stylesheet).exists()
+
+    response = get(app, href)
+    assert response.status_code == 200
+    assert response.path == str(tmp_path / "dist" / stylesheet)
+    assert "immutable" in response.headers["cache-control"]
+    assert get(app, "/styles/missing.css").status_code == 404
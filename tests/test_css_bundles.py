@@ -0,0 +1,46 @@
+from layoutml import LayoutML, Page
+from layoutml.LayoutML import get_url_path
+from layoutml.elements import Paragraph
+
+
+def make_page(name: str, color: str) -> Page:
+    page = Page(object_name=name)
+    box = Paragraph(text="box", object_name="box")
+    box.object_styles.set_color(color)
+    page.add_element(box)
+    return page
+
+
+def test_conflicting_selector_stays_in_page_files():
+    app = LayoutML(bundle_css=True)
+    colors = {"p1": "red", "p2": "red", "p3": "blue", "p4": "blue"}
+    for name, color in colors.items():
+        app.include_page(make_page(name, color))
+
+    files, manifest = app.get_css_manifest()
+    common = manifest["common"]
+    if common is not None:
+        assert ".box" not in files[common]
+    for name, color in colors.items():
+        css = "".join(files[file_name] for file_name in manifest["pages"][name]["stylesheets"])
+        assert f"color:{color}" in css.replace(" ", "")
+        other = "blue" if color == "red" else "red"
+        assert f"color:{other}" not in css.replace(" ", "")
+
+
+def test_identical_rule_moves_to_common_file():
+    app = LayoutML(bundle_css=True)
+    for name in ("p1", "p2"):
+        app.include_page(make_page(name, "red"))
+
+    files, manifest = app.get_css_manifest()
+    assert ".box" in files[manifest["common"]]
+    for name in ("p1", "p2"):
+        assert manifest["pages"][name]["stylesheets"] == [manifest["common"]]
+
+
+def test_url_path_keeps_dot_directories():
+    assert get_url_path("./styles/a.css") == "/styles/a.css"
+    assert get_url_path(".cache/css/a.css") == "/.cache/css/a.css"
+    assert get_url_path("../x/a.css") == "/x/a.css"
+    assert get_url_path("styles/a.css") == "/styles/a.css"
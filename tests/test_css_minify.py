@@ -0,0 +1,54 @@
+import asyncio
+
+from layoutml import LayoutML, Page
+from layoutml.base.css import CSSBase, group_css_rules, minify_declarations
+from layoutml.elements import Paragraph
+from layoutml.export import render_route
+
+
+def test_semicolon_inside_url_and_string():
+    css = "background-image: url(data:image/png;base64,AAAA); color:#ffffff"
+    assert minify_declarations(css) == "background-image:url(data:image/png;base64,AAAA);color:#fff"
+    assert minify_declarations('content:"a;b"; margin: 0px') == 'content:"a;b";margin:0'
+    assert minify_declarations("content:'a\\';b'; color: red") == "content:'a\\';b';color:red"
+
+
+def test_grouping_keeps_url_declarations():
+    css = "background:url(data:image/png;base64,AAAA);"
+    grouped = group_css_rules({".a": css, ".b": css})
+    assert grouped == {".a, .b": css}
+
+
+def test_minify_css_is_per_application():
+    page = Page(object_name="home")
+    paragraph = Paragraph(text="x", object_name="text")
+    paragraph.object_styles.set_color("#ffffff")
+    page.add_element(paragraph)
+
+    minified = LayoutML(minify_css=True)
+    plain = LayoutML()
+    assert CSSBase.minify is False
+    assert ".text{color:#fff}" in minified.get_page_css(page)
+    assert ".text{color:#fff}" not in plain.get_page_css(page)
+
+
+def test_minify_css_reaches_head_styles_and_style_attributes():
+    page = Page(object_name="home")
+    page.add_element(Paragraph(text="x", object_name="text", style="color: #ffffff; margin: 0px"))
+    page.head.selectors_styles.add_selector("box", "class", style="color: #ffffff; padding: 0px")
+    page.head.add_style(".a{color:red}")
+    # Кэш, собранный до подключения к приложению, не должен попасть в ответ
+    assert 'style="color:#ffffff; margin:0px;"' in page.get_html()
+
+    app = LayoutML(minify_css=True)
+
+    @app.route("/")
+    def home():
+        return page
+
+    html = asyncio.run(render_route(app, "/", {}))[0].decode()
+    assert CSSBase.minify is False
+    assert 'style="color:#fff;margin:0"' in html
+    assert "<style>.box{color:#fff;padding:0}</style>" in html
+    assert "<style>.a{color:red}</style>" in html
+    assert "".join(page.iter_html()) == html
@@ -0,0 +1,37 @@
+import asyncio
+
+import pytest
+
+from layoutml.server import HTTPRequestParser, HTTPParseError
+
+
+def read_head(head: bytes) -> HTTPRequestParser:
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(head)
+        reader.feed_eof()
+        return await HTTPRequestParser(reader).read_head()
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize(
+    "headers",
+    [
+        b"Content-Length: 5\r\nTransfer-Encoding: chunked\r\n",
+        b"Transfer-Encoding: chunked\r\nContent-Length: 5\r\n",
+        b"Content-Length: 5\r\nContent-Length: 6\r\n",
+        b"Content-Length: 5\r\nContent-Length: 5\r\n",
+        b"Content-Length: 5, 6\r\n",
+        b"Transfer-Encoding: chunked, gzip\r\n",
+    ],
+)
+def test_ambiguous_body_length_is_rejected(headers):
+    with pytest.raises(HTTPParseError) as error:
+        read_head(b"POST / HTTP/1.1\r\nHost: x\r\n" + headers + b"\r\n")
+    assert error.value.status_code == 400
+
+
+def test_single_length_or_chunked_is_accepted():
+    assert read_head(b"POST / HTTP/1.1\r\nContent-Length: 5\r\n\r\n")._remaining == 5
+    assert read_head(b"POST / HTTP/1.1\r\nTransfer-Encoding: Chunked\r\n\r\n")._chunked
@@ -0,0 +1,73 @@
+from layoutml import Page
+from layoutml.elements import Paragraph
+from layoutml.layout import VerticalLayout
+
+
+def make_page() -> Page:
+    page = Page(object_name="template")
+    card = VerticalLayout(object_name="card")
+    card.add_elements(Paragraph(text="title", object_name="title"), Paragraph(text="text", object_name="text"))
+    page.add_element(Paragraph(text="intro", object_name="intro"))
+    page.add_element(card)
+    page.get_html()
+    return page
+
+
+def test_iterating_copy_does_not_change_original():
+    page = make_page()
+    html = page.get_html()
+    clone = page.copy()
+    for element in clone.body.elements:
+        element.add_class("x")
+    assert page.get_html() == html
+    assert 'class="intro x"' in clone.get_html()
+
+
+def test_indexing_copy_does_not_change_original():
+    page = make_page()
+    html = page.get_html()
+    clone = page.copy()
+    clone.body.elements[1].add_element(Paragraph(text="added"))
+    clone.body.elements[1].elements[0].text = "changed"
+    assert page.get_html() == html
+    assert "added" in clone.get_html() and "changed" in clone.get_html()
+
+
+def test_nested_iteration_and_pop_on_copy():
+    page = make_page()
+    html = page.get_html()
+    clone = page.copy()
+    card = clone.body.elements[-1]
+    for element in reversed(card.elements):
+        element.text = "new"
+    removed = clone.body.elements.pop(0)
+    removed.text = "gone"
+    assert page.get_html() == html
+    assert "intro" not in clone.get_html() and clone.get_html().count("new") == 2
+
+
+def test_copy_of_copy_is_independent():
+    page = make_page()
+    first = page.copy()
+    second = first.copy()
+    second.body.elements[0].text = "second"
+    assert "second" not in first.get_html() and "second" not in page.get_html()
+    assert first.find("title") is first.body.elements[1].elements[0]
+
+
+def test_template_change_after_copy_reaches_copies():
+    page = make_page()
+    clone = page.copy()
+    # Копия скопировала body и карточку, заголовок карточки остаётся общим
+    clone.body.elements[1].add_class("personal")
+    clone.get_html()
+    other = page.copy()
+    other.get_html()
+
+    page.find("title").text = "new title"
+    page.find("title").text = "newest title"
+    page.find("intro").object_styles.set_color("red")
+    for copy in (clone, other):
+        assert "newest title" in copy.get_html()
+        assert "color: red" in "".join(copy.get_styles().values())
+    assert 'class="card personal"' in clone.get_html()
@@ -0,0 +1,48 @@
+from layoutml import Page
+from layoutml.elements import Select
+
+
+def make_page() -> Page:
+    page = Page(object_name="home")
+    select = Select(object_name="choice")
+    select.add_option("a", "first")
+    page.add_element(select)
+    page.body.add_script(src="app.js")
+    page.head.add_stylesheet("styles/home.css")
+    page.head.add_meta(name="description", content="old")
+    page.get_html()
+    return page
+
+
+def test_option_dict_change_resets_cache():
+    page = make_page()
+    page.body.elements[0].options[0]["text"] = "changed"
+    assert ">changed</option>" in page.get_html()
+
+
+def test_footer_script_dict_change_resets_cache():
+    page = make_page()
+    page.body.scripts_footer[0]["src"] = "new.js"
+    assert 'src="new.js"' in page.get_html()
+
+
+def test_head_link_dict_change_resets_cache():
+    page = make_page()
+    page.head.links[-1]["href"] = "styles/new.css"
+    assert 'href="styles/new.css"' in page.get_html()
+
+
+def test_head_meta_dict_change_resets_cache():
+    page = make_page()
+    page.head.meta_tags[-1]["content"] = "new"
+    assert 'content="new"' in page.get_html()
+
+
+def test_nested_dict_change_on_copy_does_not_change_original():
+    page = make_page()
+    html = page.get_html()
+    clone = page.copy()
+    clone.head.links[-1]["href"] = "styles/copy.css"
+    clone.body.scripts_footer[0]["src"] = "copy.js"
+    assert page.get_html() == html
+    assert 'href="styles/copy.css"' in clone.get_html() and 'src="copy.js"' in clone.get_html()
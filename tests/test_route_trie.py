@@ -0,0 +1,67 @@
+from layoutml.router.RouteTrie import CONVERTORS, RouteTrie
+
+
+def handler():
+    pass
+
+
+def other():
+    pass
+
+
+def make_trie(*paths) -> RouteTrie:
+    trie = RouteTrie()
+    for path, func in paths:
+        trie.insert(path, {"func": func, "original_path": path})
+    return trie
+
+
+def test_path_tail_is_not_empty():
+    trie = make_trie(("/files/{p:path}", handler))
+    assert trie.match("/files") is None
+    assert trie.match("/files/") is None
+    route, params = trie.match("/files/a/b.txt")
+    assert route["func"] is handler and params == {"p": "a/b.txt"}
+
+
+def test_empty_tail_falls_through_to_literal_route():
+    trie = make_trie(("/files/{p:path}", handler), ("/files", other))
+    route, params = trie.match("/files")
+    assert route["func"] is other and params == {}
+
+
+def test_overlapping_static_and_typed_segments():
+    trie = make_trie(
+        ("/users/me", other),
+        ("/users/{id:int}", handler),
+        ("/users/{name}", handler),
+        ("/users/{id:int}/files/{p:path}", other),
+    )
+    assert trie.match("/users/me") == ({"func": other, "original_path": "/users/me"}, {})
+    assert trie.match("/users/5")[1] == {"id": 5}
+    assert trie.match("/users/bob")[1] == {"name": "bob"}
+    assert trie.match("/users/5/files/a/b")[1] == {"id": 5, "p": "a/b"}
+    assert trie.match("/users/me/files/a") is None
+
+
+def test_miss_on_overlapping_routes_is_linear(monkeypatch):
+    # На каждом уровне сегмент "1" подходит и к статической ветви, и к {int}:
+    # перебор с возвратом обошёл бы все 2**depth маршрутов
+    depth = 12
+    trie = RouteTrie()
+    for mask in range(2**depth):
+        segments = ["1" if mask >> level & 1 else f"{{p{level}:int}}" for level in range(depth)]
+        trie.insert("/" + "/".join(segments) + "/end", {"func": handler, "original_path": ""})
+
+    calls = 0
+    convert = CONVERTORS["int"]
+
+    def counting(value):
+        nonlocal calls
+        calls += 1
+        return convert(value)
+
+    monkeypatch.setitem(CONVERTORS, "int", counting)
+    assert trie.match("/" + "/".join(["1"] * depth) + "/missing") is None
+    assert calls <= depth
+    assert trie.match("/" + "/".join(["2"] * depth) + "/end") is not None
@@ -0,0 +1,74 @@
+from layoutml import LayoutML, Page
+from layoutml.elements import Paragraph
+
+# Данные страниц вне обработчика: их изменение не меняет исходный код модуля
+CONTENT = {"text": "old"}
+
+
+def make_app() -> LayoutML:
+    app = LayoutML()
+
+    @app.route("/")
+    def index():
+        page = Page(object_name="home")
+        page.add_element(Paragraph(text=CONTENT["text"]))
+        return page
+
+    @app.route("/docs/{slug}")
+    def doc(slug: str):
+        page = Page(object_name="doc")
+        page.add_element(Paragraph(text=f"{slug} {CONTENT['text']}"))
+        return page
+
+    return app
+
+
+def test_changed_data_is_exported_again(tmp_path):
+    CONTENT["text"] = "old"
+    app = make_app()
+    manifest = app.export(str(tmp_path))
+    assert manifest["stats"]["written"] == 1
+
+    CONTENT["text"] = "new"
+    manifest = app.export(str(tmp_path))
+    assert manifest["stats"]["rendered"] == 1 and manifest["stats"]["cached"] == 0
+    assert manifest["stats"]["written"] == 1
+    assert "new" in (tmp_path / "index.html").read_text(encoding="utf-8")
+
+    manifest = app.export(str(tmp_path))
+    assert manifest["stats"]["rendered"] == 1 and manifest["stats"]["written"] == 0
+
+
+def test_version_skips_render(tmp_path):
+    CONTENT["text"] = "old"
+    app = make_app()
+    params = {"/docs/{slug}": [{"slug": "intro", "_version": 1}]}
+    app.export(str(tmp_path), params=params)
+
+    CONTENT["text"] = "new"
+    manifest = app.export(str(tmp_path), params=params)
+    assert manifest["stats"]["cached"] == 1 and manifest["stats"]["rendered"] == 1
+    assert "old" in (tmp_path / "docs" / "intro.html").read_text(encoding="utf-8")
+
+    params = {"/docs/{slug}": [{"slug": "intro", "_version": 2}]}
+    manifest = app.export(str(tmp_path), params=params)
+    assert manifest["stats"]["cached"] == 0
+    assert "new" in (tmp_path / "docs" / "intro.html").read_text(encoding="utf-8")
+
+
+def test_nested_route_links_stylesheet_from_site_root(tmp_path):
+    app = LayoutML()
+
+    @app.route("/docs/{slug}")
+    def doc(slug: str):
+        page = Page(object_name="doc")
+        paragraph = Paragraph(text=slug, object_name="text")
+        paragraph.object_styles.set_color("red")
+        page.add_element(paragraph)
+        return page
+
+    manifest = app.export(str(tmp_path), params={"/docs/{slug}": [{"slug": "s1"}]})
+    stylesheet = manifest["pages"]["docs/s1.html"]["stylesheets"][0]
+    assert (tmp_path / stylesheet).exists()
+    html = (tmp_path / "docs" / "s1.html").read_text(encoding="utf-8")
+    assert f'href="/{stylesheet}"' in html
@@ -0,0 +1,20 @@
+import asyncio
+
+from layoutml import LayoutML
+
+
+class Writer:
+    def __init__(self):
+        self.data = b""
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+
+def test_missing_file_after_head_closes_connection(tmp_path):
+    writer = Writer()
+    sent = asyncio.run(LayoutML()._send_file(writer, str(tmp_path / "gone.js"), 10))
+    assert sent is False and writer.data == b""
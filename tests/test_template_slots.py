@@ -0,0 +1,37 @@
+import gc
+
+from layoutml import Page
+from layoutml.elements import Paragraph
+from layoutml.template import Slot
+
+
+def test_slot_in_f_string():
+    page = Page(object_name="home")
+    page.add_element(Paragraph(text=f"Hello {Slot('name', escape=True)}!"))
+    gc.collect()
+    compiled = page.compile()
+    assert b"Hello &lt;b&gt;!" in compiled.render(name="<b>")
+
+
+def test_slot_in_concatenation():
+    page = Page(object_name="home")
+    page.add_element(Paragraph(text="Total: " + Slot("total", default=0)))
+    page.add_element(Paragraph(text=Slot("unit", default="pcs") + " left"))
+    gc.collect()
+    compiled = page.compile()
+    html = compiled.render_str(total=3)
+    assert "Total: 3" in html and "pcs left" in html
+
+
+def test_compiled_slots_are_released():
+    page = Page(object_name="home")
+    page.add_element(Paragraph(text=f"Hello {Slot('name')}!"))
+    page.add_element(Slot("items", default=""))
+    compiled = page.compile()
+    markers = [slot.marker for slot in compiled.slots]
+    assert not set(markers) & Slot._pending.keys()
+    page.body.elements[0].text = f"Bye {compiled.slots[0]}!"
+    assert b"Bye Anna!" in compiled.render(name="Anna")
+    del page, compiled
+    gc.collect()
+    assert not set(markers) & set(Slot._registry.keys())